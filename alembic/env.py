@@ -19,6 +19,7 @@ from app.models import (
     Competitor,
     Keyword,
     SerpResult,
+    SerpResultRaw,
     UniqueUrl,
     SerpUrlMapping
 )
@@ -0,0 +1,28 @@
+"""Index de pagination par curseur sur projects
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS : les bases récentes ont déjà l'index (créé par create_all)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_projects_created_at_id "
+        "ON projects (created_at DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_projects_created_at_id")
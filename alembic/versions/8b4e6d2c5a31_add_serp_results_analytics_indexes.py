@@ -0,0 +1,61 @@
+"""Index couvrant et index partiels analytics sur serp_results, index redondants retirés
+
+Revision ID: 8b4e6d2c5a31
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2c5a31'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+# Index que les modèles ne déclarent plus : (nom, table, colonnes)
+REDUNDANT_INDEXES = (
+    # Préfixes de idx_serp_domain_scraped / des index (project_id, scraped_at, ...)
+    ("ix_serp_results_position", "serp_results", "position"),
+    ("ix_serp_results_domain", "serp_results", "domain"),
+    # Remplacé par l'index partiel idx_serp_top_positions
+    ("idx_serp_position_scraped", "serp_results", "position, scraped_at"),
+    # Doublons des index de clé primaire
+    ("ix_projects_id", "projects", "id"),
+    ("ix_competitors_id", "competitors", "id"),
+    ("ix_keywords_id", "keywords", "id"),
+    ("ix_serp_results_id", "serp_results", "id"),
+    ("ix_unique_urls_id", "unique_urls", "id"),
+)
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS : les bases récentes ont déjà ces index (créés par create_all)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_serp_project_scraped_covering "
+        "ON serp_results (project_id, scraped_at, domain, position, competitor_id, keyword_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_serp_top_positions "
+        "ON serp_results (project_id, scraped_at, domain, position) "
+        "WHERE position <= 20"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_serp_project_discounted "
+        "ON serp_results (project_id, scraped_at) "
+        "WHERE price < price_original"
+    )
+    
+    for name, _, _ in REDUNDANT_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def downgrade() -> None:
+    for name, table, columns in REDUNDANT_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+    
+    op.execute("DROP INDEX IF EXISTS idx_serp_project_discounted")
+    op.execute("DROP INDEX IF EXISTS idx_serp_top_positions")
+    op.execute("DROP INDEX IF EXISTS idx_serp_project_scraped_covering")
@@ -0,0 +1,71 @@
+"""Données brutes SERP déplacées de serp_results vers serp_result_raw
+
+Revision ID: c2d7e4f91a6b
+Revises: 8b4e6d2c5a31
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d7e4f91a6b'
+down_revision = '8b4e6d2c5a31'
+branch_labels = None
+depends_on = None
+
+# Colonnes déplacées (JSON sur serp_results, JSONB/JSON sur serp_result_raw)
+RAW_COLUMNS = ("additional_images", "raw_data")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgresql = bind.dialect.name == "postgresql"
+    json_type = "JSONB" if is_postgresql else "JSON"
+
+    # IF NOT EXISTS : create_all a déjà pu créer la table sur les bases démarrées
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS serp_result_raw ("
+        "serp_result_id VARCHAR(36) NOT NULL PRIMARY KEY "
+        "REFERENCES serp_results (id) ON DELETE CASCADE, "
+        f"additional_images {json_type}, "
+        f"raw_data {json_type})"
+    )
+
+    existing = {column["name"] for column in sa.inspect(bind).get_columns("serp_results")}
+    if not set(RAW_COLUMNS) <= existing:
+        return
+
+    # json -> jsonb explicite sur PostgreSQL ; SQLite copie le texte tel quel
+    selected = ", ".join(
+        f"CAST({column} AS JSONB)" if is_postgresql else column for column in RAW_COLUMNS
+    )
+    op.execute(
+        f"INSERT INTO serp_result_raw (serp_result_id, {', '.join(RAW_COLUMNS)}) "
+        f"SELECT id, {selected} FROM serp_results "
+        "WHERE (additional_images IS NOT NULL OR raw_data IS NOT NULL) "
+        "AND NOT EXISTS ("
+        "SELECT 1 FROM serp_result_raw WHERE serp_result_raw.serp_result_id = serp_results.id"
+        ")"
+    )
+
+    for column in RAW_COLUMNS:
+        op.drop_column("serp_results", column)
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+
+    for column in RAW_COLUMNS:
+        op.add_column("serp_results", sa.Column(column, sa.JSON(), nullable=True))
+
+    assignments = ", ".join(
+        f"{column} = (SELECT "
+        + (f"CAST(raw.{column} AS JSON)" if is_postgresql else f"raw.{column}")
+        + " FROM serp_result_raw raw WHERE raw.serp_result_id = serp_results.id)"
+        for column in RAW_COLUMNS
+    )
+    op.execute(f"UPDATE serp_results SET {assignments}")
+
+    op.execute("DROP TABLE IF EXISTS serp_result_raw")
@@ -1,14 +1,20 @@
 """Endpoints API pour les analytics."""
 
+import asyncio
+import hashlib
+import time
 from datetime import datetime, date, timedelta
-from typing import Optional, List
+from typing import Optional, List, Any, AsyncIterator, Awaitable, Callable, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 import structlog
 
-from app.database import get_async_session
-from app.services.analytics_service import AnalyticsService
+from app.database import AsyncSessionLocal
+from app.services.analytics_service import AnalyticsService, get_analytics_service
+from app.services.cache_service import cache_service
 from app.schemas.analytics import (
     ShareOfVoiceResponse,
     PositionMatrixResponse,
@@ -16,6 +22,7 @@ from app.schemas.analytics import (
     CompetitorComparison,
     TrendAnalysisResponse,
     DashboardResponse,
+    DashboardBatchRequest,
     AnalyticsRequest,
     TrendRequest,
     ComparisonRequest,
@@ -25,24 +32,133 @@ from app.schemas.analytics import (
 
 logger = structlog.get_logger()
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# TTL court : les dashboards sont interrogés en boucle par plusieurs clients
+ANALYTICS_CACHE_TTL = 60
+
+# Calculs en cours par clé de cache (un seul calcul pour des requêtes simultanées)
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+async def singleflight(key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Partage le résultat d'un même calcul entre les requêtes concurrentes.
+    
+    Le calcul tourne dans sa propre tâche : l'annulation d'une requête en attente,
+    y compris celle qui l'a lancé, n'interrompt pas le calcul des autres. Il ne
+    doit donc dépendre d'aucune ressource de la requête (session comprise).
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(coro_factory())
+        _inflight[key] = task
+        
+        def forget(done: asyncio.Task) -> None:
+            _inflight.pop(key, None)
+            if not done.cancelled():
+                done.exception()  # Marquer l'exception comme récupérée s'il n'y a plus d'attente
+        
+        task.add_done_callback(forget)
+    
+    return await asyncio.shield(task)
+
+
+async def analytics_etag(
+    analytics_service: AnalyticsService,
+    cache_key: str,
+    project_id: str
+) -> str:
+    """ETag faible dérivé de la version des données du projet.
+    
+    Les fenêtres glissantes (7 derniers jours, etc.) évoluent même sans nouvelles
+    données : l'ETag change donc aussi à chaque période de cache.
+    """
+    data_version = await analytics_service.get_data_version(project_id)
+    time_bucket = int(time.time() // ANALYTICS_CACHE_TTL)
+    digest = hashlib.md5(f"{cache_key}:{data_version}:{time_bucket}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Vrai si l'ETag figure dans l'en-tête If-None-Match du client."""
+    return bool(if_none_match) and etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+async def cached_json(
+    cache_key: str,
+    ttl: int,
+    compute_fn: Callable[[AnalyticsService], Awaitable[Any]],
+    etag_fn: Callable[[], Awaitable[str]],
+    if_none_match: Optional[str] = None
+) -> Response:
+    """Sert une réponse JSON depuis Redis, ou la calcule puis la met en cache.
+    
+    L'entrée Redis contient l'ETag et le JSON ("<etag>\n<json>") : un hit et son
+    éventuel 304 ne touchent pas la base. etag_fn (version des données) n'est
+    appelée qu'en cas de miss. compute_fn reçoit un AnalyticsService lié à une
+    session propre au calcul partagé.
+    """
+    cached = await cache_service.get_raw(cache_key)
+    # Une entrée sans séparateur (ancien format, JSON seul) est traitée comme un miss
+    if cached is not None and "\n" in cached:
+        etag, _, payload = cached.partition("\n")
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=30"}
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=payload, media_type="application/json", headers=headers)
+    
+    etag = await etag_fn()
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=30"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    
+    async def compute() -> bytes:
+        # Session du calcul partagé : survit à l'annulation de la requête qui l'a lancé
+        async with AsyncSessionLocal() as session:
+            result = await compute_fn(AnalyticsService(session))
+        if isinstance(result, BaseModel):
+            result = result.model_dump()
+        payload = orjson.dumps(result)
+        # orjson n'émet pas de saut de ligne : il sépare sans ambiguïté l'ETag du JSON
+        await cache_service.set_raw(cache_key, etag.encode() + b"\n" + payload, ttl)
+        return payload
+    
+    payload = await singleflight(cache_key, compute)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def ndjson_encoder(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode un flux de lignes en NDJSON (un objet JSON par ligne)."""
+    async for row in rows:
+        yield orjson.dumps(row) + b"\n"
 
 
 @router.get("/dashboard/{project_id}", response_model=DashboardResponse)
 async def get_dashboard_metrics(
     project_id: str,
-    db: AsyncSession = Depends(get_async_session)
+    if_none_match: Optional[str] = Header(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Récupère les métriques du dashboard pour un projet."""
-    logger.info("Endpoint Dashboard", project_id=project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.get_dashboard_metrics(project_id=project_id)
-        return result
-    except Exception as e:
-        logger.error("Erreur récupération dashboard", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération: {str(e)}")
+    cache_key = cache_service.analytics_key("dashboard", project_id)
+    return await cached_json(
+        cache_key,
+        ANALYTICS_CACHE_TTL,
+        lambda service: service.get_dashboard_metrics(project_id=project_id),
+        lambda: analytics_etag(analytics_service, cache_key, project_id),
+        if_none_match=if_none_match
+    )
+
+
+@router.post("/dashboard/batch", response_model=Dict[str, DashboardResponse])
+async def get_dashboard_metrics_batch(
+    request: DashboardBatchRequest,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Récupère les métriques du dashboard de plusieurs projets en un appel."""
+    return await analytics_service.get_dashboard_metrics_batch(
+        project_ids=list(dict.fromkeys(request.project_ids))
+    )
 
 
 @router.get("/share-of-voice/{project_id}", response_model=ShareOfVoiceResponse)
@@ -50,22 +166,25 @@ async def get_share_of_voice(
     project_id: str,
     period_start: Optional[datetime] = Query(None, description="Début de période (ISO format)"),
     period_end: Optional[datetime] = Query(None, description="Fin de période (ISO format)"),
-    db: AsyncSession = Depends(get_async_session)
+    if_none_match: Optional[str] = Header(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Calcule le Share of Voice pour un projet."""
-    logger.info("Endpoint Share of Voice", project_id=project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.get_share_of_voice(
+    cache_key = cache_service.analytics_key(
+        "share_of_voice", project_id,
+        period_start=period_start, period_end=period_end
+    )
+    return await cached_json(
+        cache_key,
+        ANALYTICS_CACHE_TTL,
+        lambda service: service.get_share_of_voice(
             project_id=project_id,
             period_start=period_start,
             period_end=period_end
-        )
-        return result
-    except Exception as e:
-        logger.error("Erreur calcul Share of Voice", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul: {str(e)}")
+        ),
+        lambda: analytics_etag(analytics_service, cache_key, project_id),
+        if_none_match=if_none_match
+    )
 
 
 @router.get("/position-matrix/{project_id}", response_model=PositionMatrixResponse)
@@ -73,52 +192,68 @@ async def get_position_matrix(
     project_id: str,
     period_start: Optional[datetime] = Query(None, description="Début de période (ISO format)"),
     period_end: Optional[datetime] = Query(None, description="Fin de période (ISO format)"),
-    db: AsyncSession = Depends(get_async_session)
+    if_none_match: Optional[str] = Header(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Calcule la matrice de positions pour un projet."""
-    logger.info("Endpoint Position Matrix", project_id=project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.get_position_matrix(project_id=project_id)
-        return result
-    except Exception as e:
-        logger.error("Erreur calcul Position Matrix", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul: {str(e)}")
+    cache_key = cache_service.analytics_key(
+        "position_matrix", project_id,
+        period_start=period_start, period_end=period_end
+    )
+    return await cached_json(
+        cache_key,
+        ANALYTICS_CACHE_TTL,
+        lambda service: service.get_position_matrix(
+            project_id=project_id, period_start=period_start, period_end=period_end
+        ),
+        lambda: analytics_etag(analytics_service, cache_key, project_id),
+        if_none_match=if_none_match
+    )
 
 
 @router.get("/opportunities/{project_id}", response_model=OpportunitiesResponse)
 async def get_opportunities(
     project_id: str,
-    db: AsyncSession = Depends(get_async_session)
+    if_none_match: Optional[str] = Header(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Récupère les opportunités pour un projet."""
-    logger.info("Endpoint Opportunities", project_id=project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.get_opportunities(project_id=project_id)
-        return result
-    except Exception as e:
-        logger.error("Erreur récupération opportunités", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération: {str(e)}")
+    cache_key = cache_service.analytics_key("opportunities", project_id)
+    return await cached_json(
+        cache_key,
+        ANALYTICS_CACHE_TTL,
+        lambda service: service.get_opportunities(project_id=project_id),
+        lambda: analytics_etag(analytics_service, cache_key, project_id),
+        if_none_match=if_none_match
+    )
 
 
 @router.get("/keywords-positions/{project_id}")
 async def get_keywords_positions(
     project_id: str,
-    session: AsyncSession = Depends(get_async_session)
+    if_none_match: Optional[str] = Header(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Récupérer les positions détaillées de tous les mots-clés pour un projet."""
-    try:
-        service = AnalyticsService(session)
-        result = await service.get_keywords_positions(project_id)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Erreur lors de la récupération des positions", error=str(e))
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération: {str(e)}")
+    cache_key = cache_service.analytics_key("keywords_positions", project_id)
+    return await cached_json(
+        cache_key,
+        ANALYTICS_CACHE_TTL,
+        lambda service: service.get_keywords_positions(project_id),
+        lambda: analytics_etag(analytics_service, cache_key, project_id),
+        if_none_match=if_none_match
+    )
+
+
+@router.get("/keywords-positions/{project_id}/stream")
+async def stream_keywords_positions(
+    project_id: str,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Diffuser les positions des mots-clés en NDJSON, au fil de la lecture en base."""
+    reference_site = await analytics_service.get_reference_site(project_id)
+    rows = analytics_service.iter_keywords_positions(project_id, reference_site)
+    return StreamingResponse(ndjson_encoder(rows), media_type="application/x-ndjson")
 
 
 @router.get("/competitors/{project_id}", response_model=CompetitorComparison)
@@ -127,18 +262,42 @@ async def get_competitor_comparison(
     period_start: Optional[datetime] = Query(None, description="Début de période (ISO format)"),
     period_end: Optional[datetime] = Query(None, description="Fin de période (ISO format)"),
     competitor_ids: Optional[List[str]] = Query(None, description="IDs des concurrents spécifiques"),
-    db: AsyncSession = Depends(get_async_session)
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Compare les concurrents pour un projet."""
-    logger.info("Endpoint Competitor Comparison", project_id=project_id)
-    
+    # TODO: Implémenter get_competitor_comparison
+    raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
+
+
+# Correspondances précalculées valeur -> enum pour les paramètres de requête
+_PERIOD_TYPES: Dict[str, PeriodType] = {member.value: member for member in PeriodType}
+_METRIC_TYPES: Dict[str, MetricType] = {member.value: member for member in MetricType}
+
+
+def validated_period_type(
+    period_type: str = Query(PeriodType.DAY.value, description="Type de période")
+) -> PeriodType:
+    """Convertit le paramètre period_type en PeriodType (422 si inconnu)."""
+    try:
+        return _PERIOD_TYPES[period_type]
+    except KeyError:
+        raise HTTPException(
+            status_code=422,
+            detail=f"period_type invalide : {period_type} (valeurs : {', '.join(_PERIOD_TYPES)})"
+        )
+
+
+def validated_metric_type(
+    metric_type: str = Query(MetricType.AVERAGE_POSITION.value, description="Type de métrique")
+) -> MetricType:
+    """Convertit le paramètre metric_type en MetricType (422 si inconnu)."""
     try:
-        analytics_service = AnalyticsService(db)
-        # TODO: Implémenter get_competitor_comparison
-        raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
-    except Exception as e:
-        logger.error("Erreur comparaison concurrents", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la comparaison: {str(e)}")
+        return _METRIC_TYPES[metric_type]
+    except KeyError:
+        raise HTTPException(
+            status_code=422,
+            detail=f"metric_type invalide : {metric_type} (valeurs : {', '.join(_METRIC_TYPES)})"
+        )
 
 
 @router.get("/trends/{project_id}", response_model=TrendAnalysisResponse)
@@ -146,99 +305,74 @@ async def get_trend_analysis(
     project_id: str,
     period_start: Optional[date] = Query(None, description="Début de période (YYYY-MM-DD)"),
     period_end: Optional[date] = Query(None, description="Fin de période (YYYY-MM-DD)"),
-    period_type: PeriodType = Query(PeriodType.DAY, description="Type de période"),
-    metric_type: MetricType = Query(MetricType.AVERAGE_POSITION, description="Type de métrique"),
+    period_type: PeriodType = Depends(validated_period_type),
+    metric_type: MetricType = Depends(validated_metric_type),
     keyword_ids: Optional[List[str]] = Query(None, description="IDs des mots-clés spécifiques"),
-    db: AsyncSession = Depends(get_async_session)
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Analyse les tendances pour un projet."""
-    logger.info("Endpoint Trend Analysis", project_id=project_id)
+    # Version simplifiée : pas encore de données de tendance
+    start_date = period_start or (date.today() - timedelta(days=30))
+    end_date = period_end or date.today()
     
-    try:
-        analytics_service = AnalyticsService(db)
-        
-        # Version simplifiée pour éviter l'erreur 500
-        from datetime import date, timedelta
-        
-        start_date = period_start or (date.today() - timedelta(days=30))
-        end_date = period_end or date.today()
-        
-        return TrendAnalysisResponse(
-            project_id=project_id,
-            period_start=start_date,
-            period_end=end_date,
-            period_type=period_type,
-            keywords_trends=[]  # Liste vide pour l'instant
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Erreur analyse tendances", error=str(e), project_id=project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}")
+    return TrendAnalysisResponse(
+        project_id=project_id,
+        period_start=start_date,
+        period_end=end_date,
+        period_type=period_type,
+        keywords_trends=[]  # Liste vide pour l'instant
+    )
 
 
 # Endpoints pour les requêtes POST avec body JSON
 @router.post("/share-of-voice/", response_model=ShareOfVoiceResponse)
 async def calculate_share_of_voice_post(
     request: AnalyticsRequest,
-    db: AsyncSession = Depends(get_async_session)
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Calcule le Share of Voice avec requête POST."""
-    logger.info("Endpoint Share of Voice POST", project_id=request.project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        result = await analytics_service.get_share_of_voice(
-            project_id=request.project_id,
-            period_start=request.period_start,
-            period_end=request.period_end
-        )
-        return result
-    except Exception as e:
-        logger.error("Erreur calcul Share of Voice POST", error=str(e), project_id=request.project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul: {str(e)}")
+    return await analytics_service.get_share_of_voice(
+        project_id=request.project_id,
+        period_start=request.period_start,
+        period_end=request.period_end
+    )
 
 
 @router.post("/trends/", response_model=TrendAnalysisResponse)
 async def analyze_trends_post(
     request: TrendRequest,
-    db: AsyncSession = Depends(get_async_session)
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Analyse les tendances avec requête POST."""
-    logger.info("Endpoint Trend Analysis POST", project_id=request.project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        # TODO: Implémenter get_trend_analysis
-        raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
-    except Exception as e:
-        logger.error("Erreur analyse tendances POST", error=str(e), project_id=request.project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}")
+    # TODO: Implémenter get_trend_analysis
+    raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
 
 
 @router.post("/competitors/", response_model=CompetitorComparison)
 async def compare_competitors_post(
     request: ComparisonRequest,
-    db: AsyncSession = Depends(get_async_session)
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Compare les concurrents avec requête POST."""
-    logger.info("Endpoint Competitor Comparison POST", project_id=request.project_id)
-    
-    try:
-        analytics_service = AnalyticsService(db)
-        # TODO: Implémenter get_competitor_comparison
-        raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
-    except Exception as e:
-        logger.error("Erreur comparaison concurrents POST", error=str(e), project_id=request.project_id)
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la comparaison: {str(e)}")
+    # TODO: Implémenter get_competitor_comparison
+    raise HTTPException(status_code=501, detail="Fonctionnalité à venir")
 
 
 # Endpoints utilitaires
+
+# Réponse de santé pré-sérialisée, régénérée au plus une fois par seconde
+_HEALTH_CACHE = {"bytes": b"", "expires_at": 0.0}
+
+
 @router.get("/health")
 async def health_check():
     """Vérification de santé du service analytics."""
-    return {
-        "status": "healthy",
-        "service": "analytics",
-        "timestamp": datetime.utcnow().isoformat()
-    } 
\ No newline at end of file
+    now = time.monotonic()
+    if now >= _HEALTH_CACHE["expires_at"]:
+        _HEALTH_CACHE["bytes"] = orjson.dumps({
+            "status": "healthy",
+            "service": "analytics",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        _HEALTH_CACHE["expires_at"] = now + 1.0
+    return Response(content=_HEALTH_CACHE["bytes"], media_type="application/json")
@@ -1,25 +1,191 @@
 """Endpoints API pour les projets."""
 
-from typing import List, Optional
+import asyncio
+import base64
+import binascii
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
 from uuid import UUID
+import orjson
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func
+from pydantic import BaseModel, ValidationError
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import bindparam, delete, exists, insert, select, update, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.database import get_async_session
-from app.models import Project, Competitor, Keyword
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, raiseload, undefer
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_session
+from app.models import Project, Competitor, Keyword, SerpResult
 from app.schemas import (
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
-    ProjectDashboard
+    ProjectDashboard,
+    KeywordBulkCreate
 )
 from app.core.exceptions import NotFoundError, ConflictError
+from app.services.cache_service import cache_service
 
 logger = structlog.get_logger()
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Requêtes construites une seule fois à l'import (paramètre lié : project_id)
+PROJECT_EXISTS_STMT = select(exists().where(Project.id == bindparam("project_id")))
+# Compteurs de la réponse projet calculés en SQL dans la même requête
+PROJECT_BY_ID_STMT = select(Project).where(
+    Project.id == bindparam("project_id")
+).options(
+    undefer(Project.competitors_count),
+    undefer(Project.keywords_count),
+    raiseload('*')
+)
+DELETE_PROJECT_STMT = delete(Project).where(
+    Project.id == bindparam("project_id")
+).returning(Project.name).execution_options(synchronize_session=False)
+
+DASHBOARD_COMPETITORS_STMT = select(func.count(Competitor.id)).where(
+    Competitor.project_id == bindparam("project_id")
+)
+DASHBOARD_KEYWORDS_STMT = select(
+    func.count(Keyword.id),
+    func.count(Keyword.id).filter(Keyword.is_active == True)
+).where(Keyword.project_id == bindparam("project_id"))
+DASHBOARD_SERP_STMT = select(
+    func.count(SerpResult.id),
+    func.avg(SerpResult.position).filter(SerpResult.position.is_not(None)),
+    func.max(SerpResult.scraped_at)
+).where(SerpResult.project_id == bindparam("project_id"))
+
+KEYWORDS_BY_PROJECT_STMT = select(
+    Keyword.id,
+    Keyword.keyword,
+    Keyword.location,
+    Keyword.language,
+    Keyword.search_volume,
+    Keyword.is_active,
+    Keyword.created_at
+).where(Keyword.project_id == bindparam("project_id"))
+COMPETITORS_BY_PROJECT_STMT = select(
+    Competitor.id,
+    Competitor.name,
+    Competitor.domain,
+    Competitor.brand_name,
+    Competitor.is_main_brand,
+    Competitor.created_at
+).where(Competitor.project_id == bindparam("project_id"))
+COMPETITOR_BY_ID_STMT = select(Competitor).where(
+    Competitor.id == bindparam("competitor_id"),
+    Competitor.project_id == bindparam("project_id")
+)
+
+# Totaux de list_projects mémorisés par filtre (is_active, search) : une
+# précision à 30 secondes près suffit pour l'affichage de la liste
+PROJECT_COUNT_TTL = 30
+PROJECT_COUNT_MAX_ENTRIES = 256
+_project_count_cache: Dict[Tuple[Optional[bool], str], Tuple[int, float]] = {}
+
+# Nombre de lignes sérialisées par paquet dans les listes en streaming
+STREAM_CHUNK_SIZE = 500
+
+
+def invalidate_project_counts() -> None:
+    """Vide le cache des totaux de projets (création, suppression, mise à jour)."""
+    _project_count_cache.clear()
+
+
+def project_id_path(project_id: UUID = Path(..., description="ID du projet")) -> str:
+    """Valide l'ID de projet (UUID, 422 sinon) et le renvoie sous la forme stockée en base."""
+    return str(project_id)
+
+
+async def project_exists(session: AsyncSession, project_id) -> bool:
+    """Vérifie l'existence d'un projet sans charger la ligne (SELECT EXISTS)."""
+    return bool(await session.scalar(PROJECT_EXISTS_STMT, {"project_id": project_id}))
+
+
+async def stream_json_rows(
+    session: AsyncSession, stmt, params: Dict[str, Any], prefix: bytes, with_total: bool = False
+) -> AsyncIterator[bytes]:
+    """Sérialise les lignes d'une requête en tableau JSON, par paquets de STREAM_CHUNK_SIZE.
+    
+    prefix ouvre l'objet et le tableau ; l'objet est refermé après la dernière
+    ligne, avec le nombre de lignes ("total") si with_total.
+    """
+    yield prefix
+    total = 0
+    result = await session.stream(stmt, params)
+    async for partition in result.partitions(STREAM_CHUNK_SIZE):
+        chunk = b",".join(orjson.dumps(row._asdict()) for row in partition)
+        yield (b"," if total else b"") + chunk
+        total += len(partition)
+    yield b"]" + (b',"total":' + str(total).encode() if with_total else b"") + b"}"
+
+
+def project_payload(project: Project) -> Dict[str, Any]:
+    """Champs de ProjectResponse sous forme de dict, sérialisable tel quel par orjson."""
+    return {
+        "name": project.name,
+        "description": project.description,
+        "is_active": project.is_active,
+        "id": project.id,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at,
+        "competitors_count": project.competitors_count,
+        "keywords_count": project.keywords_count
+    }
+
+
+def build_project_response(project: Project) -> ProjectResponse:
+    """Construit la réponse d'un projet sans validation (ligne ORM déjà fiable)."""
+    return ProjectResponse.model_construct(
+        id=UUID(str(project.id)),
+        name=project.name,
+        description=project.description,
+        is_active=project.is_active,
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+        competitors_count=project.competitors_count,
+        keywords_count=project.keywords_count
+    )
+
+
+def encode_project_cursor(project: Project) -> str:
+    """Encode la position (created_at, id) d'un projet en curseur opaque."""
+    raw = f"{project.created_at.isoformat()}|{project.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_project_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Décode un curseur de pagination en (created_at, id)."""
+    try:
+        created_at, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), project_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def project_cursor_bound(created_at: datetime) -> Any:
+    """Borne created_at du curseur, au format des valeurs stockées.
+    
+    SQLite stocke le server_default en texte 'YYYY-MM-DD HH:MM:SS' alors qu'un
+    datetime lié est rendu avec les microsecondes ('... HH:MM:SS.000000') : la
+    comparaison texte laisserait repasser la ligne du curseur. datetime()
+    ramène la borne au format stocké ; la colonne reste nue (index utilisable).
+    """
+    if settings.database_url.startswith("sqlite"):
+        return func.datetime(created_at)
+    return created_at
 
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
@@ -56,7 +222,12 @@ async def create_project(
         
         session.add(project)
         await session.commit()
-        await session.refresh(project)
+        await session.refresh(project, attribute_names=["created_at", "updated_at"])
+        
+        # Projet neuf : aucun concurrent ni mot-clé, inutile de les compter
+        set_committed_value(project, "competitors_count", 0)
+        set_committed_value(project, "keywords_count", 0)
+        invalidate_project_counts()
         
         logger.info(
             "Projet créé avec succès",
@@ -78,12 +249,13 @@ async def create_project(
         )
 
 
-@router.get("/", response_model=ProjectListResponse)
+@router.get("/", responses={200: {"model": ProjectListResponse}})
 async def list_projects(
     page: int = Query(1, ge=1, description="Numéro de page"),
     per_page: int = Query(20, ge=1, le=100, description="Éléments par page"),
     is_active: Optional[bool] = Query(None, description="Filtrer par statut actif"),
     search: Optional[str] = Query(None, description="Rechercher dans le nom ou description"),
+    cursor: Optional[str] = Query(None, description="Curseur de la page suivante (prioritaire sur page)"),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -94,7 +266,11 @@ async def list_projects(
         per_page: Nombre d'éléments par page
         is_active: Filtrer par statut actif
         search: Terme de recherche
+        cursor: Curseur renvoyé par la page précédente (next_cursor)
     """
+    # Décodé hors du try pour que l'erreur 400 ne soit pas transformée en 500
+    after = decode_project_cursor(cursor) if cursor else None
+    
     try:
         # Construire la requête de base
         stmt = select(Project)
@@ -110,24 +286,49 @@ async def list_projects(
                 (Project.description.ilike(search_term))
             )
         
-        # Compter le total
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        count_result = await session.execute(count_stmt)
-        total = count_result.scalar()
-        
-        # Appliquer la pagination
-        offset = (page - 1) * per_page
-        stmt = stmt.order_by(Project.created_at.desc()).offset(offset).limit(per_page)
+        # Compter le total (mémorisé quelques secondes par filtre)
+        count_key = (is_active, search or "")
+        cached_count = _project_count_cache.get(count_key)
+        if cached_count and cached_count[1] > time.monotonic():
+            total = cached_count[0]
+        else:
+            count_stmt = select(func.count()).select_from(stmt.subquery())
+            count_result = await session.execute(count_stmt)
+            total = count_result.scalar()
+            if len(_project_count_cache) >= PROJECT_COUNT_MAX_ENTRIES:
+                _project_count_cache.clear()
+            _project_count_cache[count_key] = (total, time.monotonic() + PROJECT_COUNT_TTL)
+        
+        # Appliquer la pagination : par curseur (keyset) si fourni, sinon par page
+        stmt = stmt.order_by(Project.created_at.desc(), Project.id.desc())
+        if after:
+            after_created_at, after_id = after
+            stmt = stmt.where(
+                tuple_(Project.created_at, Project.id)
+                < tuple_(project_cursor_bound(after_created_at), after_id)
+            )
+        elif page > 1:
+            stmt = stmt.offset((page - 1) * per_page)
+        
+        # Compteurs de la réponse calculés en SQL (une seule requête), tout
+        # chargement paresseux lève une erreur au lieu de déclencher un N+1
+        stmt = stmt.options(
+            undefer(Project.competitors_count),
+            undefer(Project.keywords_count),
+            raiseload('*')
+        )
         
-        # Exécuter la requête
-        result = await session.execute(stmt)
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        result = await session.execute(stmt.limit(per_page + 1))
         projects = result.scalars().all()
         
         # Calculer les métadonnées de pagination
-        has_next = (offset + per_page) < total
-        has_prev = page > 1
+        has_next = len(projects) > per_page
+        projects = projects[:per_page]
+        has_prev = after is not None or page > 1
+        next_cursor = encode_project_cursor(projects[-1]) if has_next else None
         
-        logger.info(
+        logger.debug(
             "Projets récupérés",
             total=total,
             page=page,
@@ -135,14 +336,17 @@ async def list_projects(
             returned=len(projects)
         )
         
-        return ProjectListResponse(
-            projects=[ProjectResponse.model_validate(p) for p in projects],
-            total=total,
-            page=page,
-            per_page=per_page,
-            has_next=has_next,
-            has_prev=has_prev
-        )
+        # Dicts simples sérialisés directement par orjson : aucun modèle Pydantic
+        # n'est construit ni sérialisé pour la liste (schéma : ProjectListResponse)
+        return ORJSONResponse(content={
+            "projects": [project_payload(p) for p in projects],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": next_cursor
+        })
         
     except Exception as e:
         logger.error("Erreur lors de la récupération des projets", error=str(e))
@@ -152,9 +356,9 @@ async def list_projects(
         )
 
 
-@router.get("/{project_id}", response_model=ProjectResponse)
+@router.get("/{project_id}", responses={200: {"model": ProjectResponse}})
 async def get_project(
-    project_id: UUID,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -164,16 +368,13 @@ async def get_project(
         project_id: ID du projet
     """
     try:
-        stmt = select(Project).where(Project.id == project_id)
-        result = await session.execute(stmt)
+        result = await session.execute(PROJECT_BY_ID_STMT, {"project_id": project_id})
         project = result.scalar_one_or_none()
         
         if not project:
             raise NotFoundError("Project", str(project_id))
         
-        logger.debug("Projet récupéré", project_id=str(project_id))
-        
-        return ProjectResponse.model_validate(project)
+        return ORJSONResponse(content=build_project_response(project).model_dump())
         
     except NotFoundError:
         raise
@@ -191,8 +392,8 @@ async def get_project(
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
-    project_id: UUID,
     project_data: ProjectUpdate,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -205,36 +406,44 @@ async def update_project(
     logger.info("Mise à jour du projet", project_id=str(project_id))
     
     try:
-        # Récupérer le projet
-        stmt = select(Project).where(Project.id == project_id)
-        result = await session.execute(stmt)
-        project = result.scalar_one_or_none()
-        
-        if not project:
-            raise NotFoundError("Project", str(project_id))
+        update_data = project_data.model_dump(exclude_unset=True)
         
-        # Vérifier l'unicité du nom si modifié
-        if project_data.name and project_data.name != project.name:
-            existing_stmt = select(Project).where(
-                (Project.name == project_data.name) & 
-                (Project.id != project_id)
+        if update_data:
+            # Une seule requête : l'UPDATE ne s'applique que si le nouveau nom
+            # n'est pas déjà pris par un autre projet
+            update_stmt = update(Project).where(Project.id == project_id)
+            if project_data.name:
+                other = aliased(Project)
+                update_stmt = update_stmt.where(
+                    ~exists().where(
+                        (other.name == project_data.name) & (other.id != project_id)
+                    )
+                )
+            result = await session.execute(
+                update_stmt.values(**update_data)
+                .returning(Project.id)
+                .execution_options(synchronize_session=False)
             )
-            existing_result = await session.execute(existing_stmt)
-            existing_project = existing_result.scalar_one_or_none()
             
-            if existing_project:
+            if result.first() is None:
+                # Cas rare : distinguer projet absent et conflit de nom
+                if not await project_exists(session, project_id):
+                    raise NotFoundError("Project", str(project_id))
                 raise ConflictError(
                     f"Un projet avec le nom '{project_data.name}' existe déjà",
                     details={"name": project_data.name}
                 )
+            
+            await session.commit()
+            await cache_service.invalidate_project_cache(str(project_id))
+            invalidate_project_counts()
         
-        # Mettre à jour les champs modifiés
-        update_data = project_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(project, field, value)
+        # Relire le projet à jour (avec les relations des compteurs)
+        result = await session.execute(PROJECT_BY_ID_STMT, {"project_id": project_id})
+        project = result.scalar_one_or_none()
         
-        await session.commit()
-        await session.refresh(project)
+        if not project:
+            raise NotFoundError("Project", str(project_id))
         
         logger.info(
             "Projet mis à jour avec succès",
@@ -262,7 +471,7 @@ async def update_project(
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
-    project_id: UUID,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -274,22 +483,22 @@ async def delete_project(
     logger.info("Suppression du projet", project_id=str(project_id))
     
     try:
-        # Récupérer le projet
-        stmt = select(Project).where(Project.id == project_id)
-        result = await session.execute(stmt)
-        project = result.scalar_one_or_none()
+        # Supprimer le projet en une requête (ON DELETE CASCADE côté base pour
+        # les concurrents, mots-clés et résultats SERP)
+        result = await session.execute(DELETE_PROJECT_STMT, {"project_id": project_id})
+        deleted = result.first()
         
-        if not project:
+        if deleted is None:
             raise NotFoundError("Project", str(project_id))
         
-        # Supprimer le projet (cascade supprimera les données associées)
-        await session.delete(project)
         await session.commit()
+        await cache_service.invalidate_project_cache(str(project_id))
+        invalidate_project_counts()
         
         logger.info(
             "Projet supprimé avec succès",
             project_id=str(project_id),
-            name=project.name
+            name=deleted.name
         )
         
     except NotFoundError:
@@ -307,9 +516,9 @@ async def delete_project(
         )
 
 
-@router.get("/{project_id}/dashboard", response_model=ProjectDashboard)
+@router.get("/{project_id}/dashboard", responses={200: {"model": ProjectDashboard}})
 async def get_project_dashboard(
-    project_id: UUID,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -319,62 +528,35 @@ async def get_project_dashboard(
         project_id: ID du projet
     """
     try:
-        from sqlalchemy import func
-        from app.models import SerpResult
-        
-        # Récupérer le projet
-        project_stmt = select(Project).where(Project.id == project_id)
-        project_result = await session.execute(project_stmt)
+        params = {"project_id": project_id}
+        
+        async def fetch_row(stmt):
+            # Une session par requête : une AsyncSession n'est pas utilisable en concurrence
+            async with AsyncSessionLocal() as aggregate_session:
+                return (await aggregate_session.execute(stmt, params)).one()
+        
+        # Une requête d'agrégats par table, le projet et les agrégats en parallèle
+        project_result, (total_competitors,), keywords_row, serp_row = await asyncio.gather(
+            session.execute(PROJECT_BY_ID_STMT, params),
+            fetch_row(DASHBOARD_COMPETITORS_STMT),  # Concurrents
+            fetch_row(DASHBOARD_KEYWORDS_STMT),     # Mots-clés (total et actifs)
+            fetch_row(DASHBOARD_SERP_STMT)          # SERP (total, position moyenne, dernier scraping)
+        )
         project = project_result.scalar_one_or_none()
         
         if not project:
             raise NotFoundError("Project", str(project_id))
         
-        # Compter les concurrents
-        competitors_stmt = select(func.count(Competitor.id)).where(
-            Competitor.project_id == project_id
-        )
-        competitors_result = await session.execute(competitors_stmt)
-        total_competitors = competitors_result.scalar() or 0
-        
-        # Compter les mots-clés
-        keywords_stmt = select(func.count(Keyword.id)).where(
-            Keyword.project_id == project_id
-        )
-        keywords_result = await session.execute(keywords_stmt)
-        total_keywords = keywords_result.scalar() or 0
+        total_keywords, active_keywords = keywords_row
+        total_serp_results, average_position, last_scrape_date = serp_row
         
-        active_keywords_stmt = select(func.count(Keyword.id)).where(
-            (Keyword.project_id == project_id) & 
-            (Keyword.is_active == True)
-        )
-        active_keywords_result = await session.execute(active_keywords_stmt)
-        active_keywords = active_keywords_result.scalar() or 0
-        
-        # Métriques SERP
-        serp_count_stmt = select(func.count(SerpResult.id)).where(
-            SerpResult.project_id == project_id
-        )
-        serp_count_result = await session.execute(serp_count_stmt)
-        total_serp_results = serp_count_result.scalar() or 0
-        
-        # Position moyenne (approximation simple)
-        avg_position_stmt = select(func.avg(SerpResult.position)).where(
-            (SerpResult.project_id == project_id) & 
-            (SerpResult.position.is_not(None))
-        )
-        avg_position_result = await session.execute(avg_position_stmt)
-        average_position = avg_position_result.scalar()
-        
-        # Dernière date de scraping
-        last_scrape_stmt = select(func.max(SerpResult.scraped_at)).where(
-            SerpResult.project_id == project_id
-        )
-        last_scrape_result = await session.execute(last_scrape_stmt)
-        last_scrape_date = last_scrape_result.scalar()
+        total_competitors = total_competitors or 0
+        total_keywords = total_keywords or 0
+        active_keywords = active_keywords or 0
+        total_serp_results = total_serp_results or 0
         
-        dashboard = ProjectDashboard(
-            project=ProjectResponse.model_validate(project),
+        dashboard = ProjectDashboard.model_construct(
+            project=build_project_response(project),
             total_keywords=total_keywords,
             active_keywords=active_keywords,
             total_competitors=total_competitors,
@@ -395,7 +577,7 @@ async def get_project_dashboard(
             total_competitors=total_competitors
         )
         
-        return dashboard
+        return ORJSONResponse(content=dashboard.model_dump())
         
     except NotFoundError:
         raise
@@ -413,96 +595,111 @@ async def get_project_dashboard(
 
 @router.get("/{project_id}/keywords")
 async def get_project_keywords(
-    project_id: str,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Récupérer tous les mots-clés d'un projet"""
     logger.info("Récupération des mots-clés du projet", project_id=project_id)
     
     # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
-    
-    if not project:
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
     
-    # Récupérer les mots-clés du projet
-    keywords_query = select(Keyword).where(Keyword.project_id == project_id)
-    keywords_result = await session.execute(keywords_query)
-    keywords = keywords_result.scalars().all()
+    # Mots-clés sérialisés et envoyés par paquets (mémoire bornée pour les gros projets)
+    return StreamingResponse(
+        stream_json_rows(
+            session, KEYWORDS_BY_PROJECT_STMT, {"project_id": project_id},
+            b'{"project_id":' + orjson.dumps(project_id) + b',"keywords":['
+        ),
+        media_type="application/json"
+    )
+
+
+def inline_json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Schéma JSON d'un modèle, définitions imbriquées ($defs) remplacées en place.
     
-    logger.info("Mots-clés récupérés", project_id=project_id, count=len(keywords))
+    Utilisé dans openapi_extra, où les références #/$defs/... ne se résolvent pas.
+    """
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
     
-    return {
-        "project_id": project_id,
-        "keywords": [
-            {
-                "id": keyword.id,
-                "keyword": keyword.keyword,
-                "location": keyword.location,
-                "language": keyword.language,
-                "search_volume": keyword.search_volume,
-                "is_active": keyword.is_active,
-                "created_at": keyword.created_at.isoformat()
-            }
-            for keyword in keywords
-        ]
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return resolve(definitions[ref.rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+    
+    return resolve(schema)
+
+
+# Corps lu brut par la route : le schéma est déclaré explicitement pour l'OpenAPI
+KEYWORD_BULK_CREATE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": inline_json_schema(KeywordBulkCreate)}}
     }
+}
 
 
-@router.post("/{project_id}/keywords")
+@router.post("/{project_id}/keywords", openapi_extra=KEYWORD_BULK_CREATE_BODY)
 async def add_project_keywords(
-    project_id: str,
-    keywords_data: dict,
+    request: Request,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Ajouter des mots-clés en bulk à un projet"""
+    """Ajouter des mots-clés en bulk à un projet (corps : KeywordBulkCreate)"""
     logger.info("Ajout de mots-clés au projet", project_id=project_id)
     
-    # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
+    # Corps brut analysé et validé en une seule passe pydantic-core
+    try:
+        keywords_data = KeywordBulkCreate.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Même forme que les erreurs de corps de FastAPI : loc préfixée par "body"
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
     
-    if not project:
+    # Vérifier que le projet existe
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
     
     try:
-        # Récupérer les données des mots-clés
-        keywords_list = keywords_data.get("keywords", [])
-        if not keywords_list:
-            raise HTTPException(status_code=400, detail="Aucun mot-clé fourni")
-        
-        # Créer les nouveaux mots-clés
-        new_keywords = []
-        for kw_data in keywords_list:
-            keyword = Keyword(
-                project_id=project_id,
-                keyword=kw_data.get("keyword", "").strip(),
-                location=kw_data.get("location", "France"),
-                language=kw_data.get("language", "fr"),
-                search_volume=kw_data.get("search_volume", 0),
-                is_active=kw_data.get("is_active", True)
-            )
-            
-            if not keyword.keyword:
-                continue  # Ignorer les mots-clés vides
-                
-            new_keywords.append(keyword)
-            session.add(keyword)
+        # Préparer les lignes à insérer (mots-clés déjà nettoyés par le schéma)
+        rows = [
+            {
+                "project_id": project_id,
+                "keyword": kw.keyword,
+                "location": kw.location,
+                "language": kw.language,
+                "search_volume": kw.search_volume if kw.search_volume is not None else 0,
+                "is_active": kw.is_active
+            }
+            for kw in keywords_data.keywords
+        ]
         
-        if not new_keywords:
-            raise HTTPException(status_code=400, detail="Aucun mot-clé valide fourni")
+        # Un seul INSERT ... RETURNING au lieu d'un add + refresh par mot-clé
+        insert_stmt = insert(Keyword).returning(
+            Keyword.id,
+            Keyword.keyword,
+            Keyword.location,
+            Keyword.language,
+            Keyword.search_volume,
+            Keyword.is_active,
+            Keyword.created_at
+        )
+        result = await session.execute(insert_stmt, rows)
+        new_keywords = result.all()
         
         # Sauvegarder en base
         await session.commit()
-        
-        # Rafraîchir les objets pour avoir les IDs
-        for keyword in new_keywords:
-            await session.refresh(keyword)
+        await cache_service.invalidate_project_cache(project_id)
         
         logger.info("Mots-clés ajoutés avec succès", project_id=project_id, count=len(new_keywords))
         
@@ -538,93 +735,77 @@ async def add_project_keywords(
 
 @router.get("/{project_id}/competitors")
 async def get_project_competitors(
-    project_id: str,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Récupérer tous les concurrents d'un projet"""
     logger.info("Récupération des concurrents du projet", project_id=project_id)
 
     # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
-
-    if not project:
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
 
-    # Récupérer les concurrents du projet
-    competitors_query = select(Competitor).where(Competitor.project_id == project_id)
-    competitors_result = await session.execute(competitors_query)
-    competitors = competitors_result.scalars().all()
-
-    logger.info("Concurrents récupérés", project_id=project_id, count=len(competitors))
-
-    return {
-        "project_id": project_id,
-        "competitors": [
-            {
-                "id": competitor.id,
-                "name": competitor.name,
-                "domain": competitor.domain,
-                "brand_name": competitor.brand_name,
-                "is_main_brand": competitor.is_main_brand,
-                "created_at": competitor.created_at.isoformat()
-            }
-            for competitor in competitors
-        ],
-        "total": len(competitors)
-    }
+    # Concurrents sérialisés et envoyés par paquets (mémoire bornée pour les gros projets)
+    return StreamingResponse(
+        stream_json_rows(
+            session, COMPETITORS_BY_PROJECT_STMT, {"project_id": project_id},
+            b'{"project_id":' + orjson.dumps(project_id) + b',"competitors":[',
+            with_total=True
+        ),
+        media_type="application/json"
+    )
 
 
 @router.post("/{project_id}/competitors")
 async def add_project_competitor(
-    project_id: str,
     competitor_data: dict,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Ajouter un concurrent à un projet"""
     logger.info("Ajout d'un concurrent au projet", project_id=project_id)
 
     # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
-
-    if not project:
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
 
     try:
-        # Vérifier si le concurrent existe déjà
-        existing_query = select(Competitor).where(
-            Competitor.project_id == project_id,
-            Competitor.domain == competitor_data.get("domain", "").strip()
-        )
-        existing_result = await session.execute(existing_query)
-        existing_competitor = existing_result.scalar_one_or_none()
+        name = competitor_data.get("name", "").strip()
+        domain = competitor_data.get("domain", "").strip()
 
-        if existing_competitor:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Un concurrent avec le domaine '{competitor_data.get('domain')}' existe déjà"
-            )
+        if not name or not domain:
+            raise HTTPException(status_code=400, detail="Le nom et le domaine sont obligatoires")
 
-        # Créer le nouveau concurrent
-        competitor = Competitor(
+        # Insertion atomique : un doublon (project_id, domain) n'insère rien
+        insert_fn = sqlite_insert if settings.database_url.startswith("sqlite") else pg_insert
+        insert_stmt = insert_fn(Competitor).values(
             project_id=project_id,
-            name=competitor_data.get("name", "").strip(),
-            domain=competitor_data.get("domain", "").strip(),
+            name=name,
+            domain=domain,
             brand_name=competitor_data.get("brand_name", "").strip(),
             is_main_brand=competitor_data.get("is_main_brand", False)
+        ).on_conflict_do_nothing(
+            index_elements=["project_id", "domain"]
+        ).returning(
+            Competitor.id,
+            Competitor.name,
+            Competitor.domain,
+            Competitor.brand_name,
+            Competitor.is_main_brand,
+            Competitor.created_at
         )
+        competitor = (await session.execute(insert_stmt)).first()
 
-        if not competitor.name or not competitor.domain:
-            raise HTTPException(status_code=400, detail="Le nom et le domaine sont obligatoires")
+        if competitor is None:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Un concurrent avec le domaine '{competitor_data.get('domain')}' existe déjà"
+            )
 
-        session.add(competitor)
         await session.commit()
-        await session.refresh(competitor)
+        await cache_service.invalidate_project_cache(project_id)
 
         logger.info("Concurrent ajouté avec succès", project_id=project_id, competitor_id=competitor.id)
 
@@ -651,28 +832,22 @@ async def add_project_competitor(
 
 @router.delete("/{project_id}/competitors/{competitor_id}")
 async def delete_project_competitor(
-    project_id: str,
     competitor_id: str,
+    project_id: str = Depends(project_id_path),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Supprimer un concurrent d'un projet"""
     logger.info("Suppression d'un concurrent", project_id=project_id, competitor_id=competitor_id)
 
     # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
-
-    if not project:
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
 
     # Vérifier que le concurrent existe
-    competitor_query = select(Competitor).where(
-        Competitor.id == competitor_id,
-        Competitor.project_id == project_id
+    competitor_result = await session.execute(
+        COMPETITOR_BY_ID_STMT, {"competitor_id": competitor_id, "project_id": project_id}
     )
-    competitor_result = await session.execute(competitor_query)
     competitor = competitor_result.scalar_one_or_none()
 
     if not competitor:
@@ -682,6 +857,7 @@ async def delete_project_competitor(
     try:
         await session.delete(competitor)
         await session.commit()
+        await cache_service.invalidate_project_cache(project_id)
 
         logger.info("Concurrent supprimé avec succès", project_id=project_id, competitor_id=competitor_id)
 
@@ -1,28 +1,103 @@
 """API endpoints pour le scraping et l'analyse SERP."""
 
+import asyncio
+import uuid
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import structlog
 
-from app.database import get_async_session
-from app.models.project import Project
-from app.services.dataforseo_service import DataForSEOService
+from app.database import AsyncSessionLocal, get_async_session
+from app.api.projects import project_exists, project_id_path
+from app.services.dataforseo_service import (
+    DataForSEOService,
+    dataforseo_service,
+    get_dataforseo_service
+)
+from app.services.cache_service import cache_service
 
 logger = structlog.get_logger()
 
 router = APIRouter()
 
-@router.post("/projects/{project_id}/analyze")
+# Analyses SERP en cours dans ce processus (références fortes sur les tâches).
+# None : place réservée, la tâche n'est pas encore créée.
+_analysis_tasks: Dict[str, Optional[asyncio.Task]] = {}
+# Dernier statut connu par projet (repli si Redis est indisponible)
+_analysis_status: Dict[str, Dict[str, Any]] = {}
+
+# Durée maximale du verrou d'analyse partagé entre workers (libéré en fin de tâche)
+ANALYSIS_LOCK_TTL = 3600
+
+
+async def _save_analysis_status(project_id: str, **status) -> None:
+    """Met à jour le statut d'analyse d'un projet (mémoire locale + Redis)."""
+    data = {**_analysis_status.get(project_id, {}), **status, "updated_at": datetime.utcnow().isoformat()}
+    _analysis_status[project_id] = data
+    await cache_service.set_analysis_status(project_id, data)
+
+
+async def _run_analysis(job_id: str, project_id: str, keyword_ids: Optional[List[str]]) -> None:
+    """Exécute l'analyse DataForSEO hors de la requête HTTP, avec sa propre session."""
+    try:
+        await _save_analysis_status(project_id, job_id=job_id, status="running")
+        
+        async with AsyncSessionLocal() as session:
+            result = await dataforseo_service.analyze_keywords_for_project(
+                session=session,
+                project_id=project_id,
+                keyword_ids=keyword_ids
+            )
+        await cache_service.invalidate_project_cache(project_id)
+        
+        logger.info("Analyse SERP terminée", project_id=project_id, job_id=job_id, **result.get('stats', {}))
+        await _save_analysis_status(project_id, status="completed", result=result)
+        
+    except asyncio.CancelledError:
+        logger.warning("Analyse SERP interrompue", project_id=project_id, job_id=job_id)
+        await _save_analysis_status(project_id, status="cancelled")
+        raise
+    except Exception as e:
+        logger.error("Erreur lors de l'analyse", project_id=project_id, job_id=job_id, error=str(e))
+        await _save_analysis_status(project_id, status="failed", error=str(e))
+    finally:
+        if _analysis_tasks.get(project_id) is asyncio.current_task():
+            _analysis_tasks.pop(project_id, None)
+        await cache_service.release_analysis_lock(project_id, job_id)
+
+
+async def cancel_analysis_tasks() -> None:
+    """Annuler et attendre les analyses en cours (arrêt de l'application)."""
+    tasks = [task for task in _analysis_tasks.values() if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _analysis_already_running(project_id: str, current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Réponse renvoyée quand une analyse du projet est déjà en cours."""
+    current = current or {}
+    return {
+        "message": "Analyse SERP déjà en cours",
+        "project_id": project_id,
+        "job_id": current.get("job_id"),
+        "status": current.get("status", "running")
+    }
+
+
+@router.post("/projects/{project_id}/analyze", status_code=202)
 async def analyze_project_keywords(
-    project_id: str,
+    project_id: str = Depends(project_id_path),
     keyword_ids: Optional[List[str]] = Query(None),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Lancer l'analyse SERP pour un projet avec DataForSEO.
     
+    L'analyse s'exécute en tâche de fond : la réponse (202) est immédiate et
+    l'avancement se suit via /analysis-status.
+    
     Args:
         project_id: ID du projet à analyser
         keyword_ids: Liste optionnelle d'IDs de mots-clés spécifiques
@@ -31,68 +106,78 @@ async def analyze_project_keywords(
     logger.info("Demande d'analyse SERP", project_id=project_id)
     
     # Vérifier que le projet existe
-    project_query = select(Project).where(Project.id == project_id)
-    project_result = await session.execute(project_query)
-    project = project_result.scalar_one_or_none()
-    
-    if not project:
+    if not await project_exists(session, project_id):
         logger.error("Projet non trouvé", project_id=project_id)
         raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
     
+    # Une seule analyse à la fois par projet : place réservée dans ce processus
+    # avant tout await, puis verrou Redis partagé entre workers
+    if project_id in _analysis_tasks:
+        return _analysis_already_running(project_id, _analysis_status.get(project_id))
+    _analysis_tasks[project_id] = None
+    
+    job_id = str(uuid.uuid4())
     try:
-        # Créer le service DataForSEO
-        dataforseo_service = DataForSEOService()
+        if not await cache_service.acquire_analysis_lock(project_id, job_id, ANALYSIS_LOCK_TTL):
+            _analysis_tasks.pop(project_id, None)
+            return _analysis_already_running(
+                project_id, await cache_service.get_analysis_status(project_id)
+            )
         
-        # Lancer l'analyse directement (pour l'instant)
-        result = await dataforseo_service.analyze_keywords_for_project(
-            session=session,
-            project_id=project_id,
-            keyword_ids=keyword_ids
-        )
-        
-        logger.info("Analyse SERP terminée", project_id=project_id, **result.get('stats', {}))
-        
-        return {
-            "message": "Analyse SERP terminée avec succès",
-            "project_id": project_id,
-            "status": "completed",
-            "result": result
-        }
-        
-    except Exception as e:
-        logger.error("Erreur lors de l'analyse", error=str(e))
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de l'analyse SERP: {str(e)}"
-        )
+        await _save_analysis_status(project_id, job_id=job_id, status="queued", result=None, error=None)
+        _analysis_tasks[project_id] = asyncio.create_task(_run_analysis(job_id, project_id, keyword_ids))
+    except BaseException:
+        # Réservation abandonnée (erreur ou requête annulée) : libérer la place et le verrou
+        if _analysis_tasks.get(project_id) is None:
+            _analysis_tasks.pop(project_id, None)
+            await cache_service.release_analysis_lock(project_id, job_id)
+        raise
+    
+    return {
+        "message": "Analyse SERP lancée",
+        "project_id": project_id,
+        "job_id": job_id,
+        "status": "queued"
+    }
 
 
 @router.get("/projects/{project_id}/analysis-status")
 async def get_analysis_status(
-    project_id: str,
-    session: AsyncSession = Depends(get_async_session)
+    project_id: str = Depends(project_id_path)
 ):
     """
     Récupérer le statut de la dernière analyse pour un projet.
     """
+    status = await cache_service.get_analysis_status(project_id) or _analysis_status.get(project_id)
+    
+    if not status:
+        return {
+            "project_id": project_id,
+            "status": "idle",
+            "last_analysis": None,
+            "message": "Aucune analyse lancée pour ce projet"
+        }
+    
     return {
         "project_id": project_id,
-        "status": "completed",
-        "last_analysis": None,
-        "message": "Statut d'analyse non encore implémenté"
+        "job_id": status.get("job_id"),
+        "status": status.get("status"),
+        "last_analysis": status.get("updated_at"),
+        "result": status.get("result"),
+        "error": status.get("error")
     }
 
 
 @router.post("/test-dataforseo")
-async def test_dataforseo_connection():
+async def test_dataforseo_connection(
+    dataforseo_service: DataForSEOService = Depends(get_dataforseo_service)
+):
     """
     Tester la connexion à DataForSEO avec un mot-clé simple.
     """
     logger.info("Test de connexion DataForSEO")
     
     try:
-        dataforseo_service = DataForSEOService()
-        
         # Test avec un seul mot-clé
         test_keywords = ["smartphone"]
         
@@ -126,13 +211,13 @@ async def test_dataforseo_connection():
 
 
 @router.post("/test-single-keyword")
-async def test_single_keyword():
+async def test_single_keyword(
+    dataforseo_service: DataForSEOService = Depends(get_dataforseo_service)
+):
     """Test avec un seul mot-clé pour debug."""
     logger.info("Test avec un seul mot-clé")
     
     try:
-        dataforseo_service = DataForSEOService()
-        
         # Test avec "porte de garage" qui fonctionne avec curl
         result = await dataforseo_service.get_serp_results(["porte de garage"])
         
@@ -16,7 +16,7 @@ class ShoppingMonitorException(Exception):
         self.message = message
         self.status_code = status_code
         self.error_type = error_type
-        self.details = details or {}
+        self.details = details if details is not None else {}
         super().__init__(self.message)
 
 
@@ -79,11 +79,14 @@ class ExternalAPIError(ShoppingMonitorException):
         status_code: int = 502,
         details: Optional[Dict[str, Any]] = None
     ):
+        # Le dict fourni (toujours construit à l'appel) est complété plutôt que recopié
+        details = details if details is not None else {}
+        details["service"] = service
         super().__init__(
             message=f"Erreur {service}: {message}",
             status_code=status_code,
             error_type="ExternalAPIError",
-            details={**(details or {}), "service": service}
+            details=details
         )
 
 
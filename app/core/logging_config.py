@@ -0,0 +1,35 @@
+"""Configuration structlog partagée par les points d'entrée de l'application."""
+
+import logging
+
+import orjson
+import structlog
+
+from app.config import settings
+
+
+def resolve_log_level() -> int:
+    """Niveau de log numérique correspondant à settings.log_level."""
+    return getattr(logging, settings.log_level.upper(), logging.INFO)
+
+
+def configure_logging() -> None:
+    """Configurer structlog une fois, avant la première utilisation d'un logger.
+
+    Les appels sous le niveau configuré sont des no-op, rendu console en debug,
+    JSON sérialisé par orjson (bytes écrits directement) sinon.
+    """
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            structlog.dev.ConsoleRenderer() if settings.debug
+            else structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(resolve_log_level()),
+        logger_factory=structlog.PrintLoggerFactory() if settings.debug
+        else structlog.BytesLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
@@ -1,12 +1,16 @@
 """Configuration de la base de données SQLAlchemy."""
 
-import os
+import asyncio
+import sys
+from functools import lru_cache
+from pathlib import Path
 from typing import AsyncGenerator
 
-from sqlalchemy import create_engine, String
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import Engine, JSON, event, make_url, String
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import orjson
 import structlog
 
 from app.config import settings
@@ -17,43 +21,96 @@ logger = structlog.get_logger()
 # Base pour les modèles
 Base = declarative_base()
 
-# Moteurs de base de données
-async_engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-)
+# Moteurs de base de données (créés à la demande par les accesseurs ci-dessous)
+# SQLite garde le pool par défaut du dialecte, PostgreSQL un pool dimensionné pour la charge.
+# Les dashboards ouvrent une session par agrégat (jusqu'à 8 connexions par requête) :
+# pool_size + max_overflow doit couvrir ce fan-out multiplié par les requêtes simultanées.
+_async_pool_options = {} if settings.database_url.startswith("sqlite") else {
+    "poolclass": AsyncAdaptedQueuePool,
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_timeout": settings.db_pool_timeout,
+}
+
+
+def json_serializer(value) -> str:
+    """Sérialiseur JSON des colonnes JSON/JSONB (orjson, renvoyé en str comme json.dumps)."""
+    return orjson.dumps(value).decode()
+
+
+# Options communes aux moteurs async et sync
+engine_json_options = {
+    "json_serializer": json_serializer,
+    "json_deserializer": orjson.loads,
+}
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Active les clés étrangères SQLite (ON DELETE CASCADE appliqué par la base)."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(sync_engine: Engine) -> None:
+    """Branche le PRAGMA foreign_keys sur chaque connexion d'un moteur SQLite."""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Moteur async, créé au premier usage (Alembic et scripts n'en ont pas besoin)."""
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        **engine_json_options,
+        **_async_pool_options
+    )
+    
+    enable_sqlite_foreign_keys(engine.sync_engine)
+    return engine
 
-sync_engine = create_engine(
-    settings.database_url_sync,
-    echo=settings.debug,
-    pool_pre_ping=True,
-)
 
 # Sessions
-AsyncSessionLocal = async_sessionmaker(
-    async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
-
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=sync_engine
-)
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Fabrique de sessions async liée au moteur async."""
+    return async_sessionmaker(
+        get_async_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Nouvelle session async (le moteur est créé au premier appel)."""
+    return get_async_sessionmaker()()
+
 
 # Helper pour les types UUID selon la base de données
+_IS_SQLITE = settings.database_url.startswith("sqlite")
+
+try:
+    from sqlalchemy.dialects.postgresql import JSONB as _PG_JSONB, UUID as _PG_UUID
+except ImportError:
+    _PG_JSONB = _PG_UUID = None
+
+# Documents JSON : JSONB sur PostgreSQL (stocké décodé, pas de re-parsing à la lecture), JSON ailleurs
+JSONDocument = JSON().with_variant(_PG_JSONB(), "postgresql") if _PG_JSONB is not None else JSON()
+
+
+@lru_cache(maxsize=1)
 def get_uuid_column():
-    """Retourne le type de colonne approprié pour les UUIDs selon la base de données."""
-    if settings.database_url.startswith("sqlite"):
+    """Retourne le type de colonne approprié pour les UUIDs selon la base de données.
+
+    Le type est calculé une seule fois puis partagé par toutes les colonnes.
+    """
+    if _IS_SQLITE or _PG_UUID is None:
         return String(36)  # UUID sous forme de string pour SQLite
-    else:
-        try:
-            from sqlalchemy.dialects.postgresql import UUID
-            return UUID(as_uuid=True)
-        except ImportError:
-            return String(36)
+    return _PG_UUID(as_uuid=True)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -65,61 +122,60 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-def get_sync_session():
-    """Générateur de session sync."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 async def init_db():
     """Initialise la base de données."""
-    import os
-    from urllib.parse import urlparse
-    
-    # Log de la configuration de la base de données
-    logger.info(
-        "Initialisation de la base de données",
-        database_url=settings.database_url,
-        database_url_sync=settings.database_url_sync
-    )
+    # Un seul événement de log, émis une fois les tables créées
+    details = {
+        "database_url": make_url(settings.database_url).render_as_string(hide_password=True)
+    }
     
-    # Pour SQLite, afficher le chemin absolu du fichier
-    if settings.database_url.startswith("sqlite"):
-        parsed_url = urlparse(settings.database_url)
-        db_path = parsed_url.path
-        if db_path.startswith("///"):
-            # Chemin absolu : sqlite:///path/to/db.db
-            actual_path = db_path[3:]  # Enlever les 3 premiers /
-        else:
-            # Chemin relatif : sqlite://./db.db
-            actual_path = db_path[1:]  # Enlever le premier /
-            
-        # Résoudre le chemin complet
-        full_path = os.path.abspath(actual_path)
-        
-        logger.info(
-            "Configuration SQLite détectée",
-            db_file_path=actual_path,
-            absolute_path=full_path,
-            file_exists=os.path.exists(full_path),
-            working_directory=os.getcwd()
+    # Diagnostic du fichier SQLite, uniquement en debug (évite les accès disque au démarrage)
+    if settings.debug and _IS_SQLITE:
+        db_file = Path(make_url(settings.database_url).database or "")
+        full_path = db_file.resolve()
+        details.update(
+            db_file_path=str(db_file),
+            absolute_path=str(full_path),
+            file_existed=full_path.exists(),
+            working_directory=str(Path.cwd())
         )
     
-    async with async_engine.begin() as conn:
+    # Les modèles sont réexportés à la demande : les enregistrer tous avant create_all
+    from app.models import load_all_models
+    load_all_models()
+    
+    async with get_async_engine().begin() as conn:
         # Créer toutes les tables
         await conn.run_sync(Base.metadata.create_all)
     
-    logger.info("Base de données initialisée avec succès")
+    logger.info("Base de données initialisée avec succès", **details)
+
+
+async def warm_up_pool():
+    """Ouvre les connexions permanentes du pool avant l'arrivée du trafic."""
+    if not _async_pool_options:
+        return
+    
+    connections = await asyncio.gather(
+        *[get_async_engine().connect() for _ in range(settings.db_pool_size)]
+    )
+    await asyncio.gather(*[connection.close() for connection in connections])
+    
+    logger.info("Pool de connexions préchauffé", pool_size=settings.db_pool_size)
 
 
 async def close_db():
     """Ferme les connexions à la base de données."""
-    logger.info("Fermeture des connexions à la base de données")
+    # Seuls les moteurs effectivement créés sont fermés, en parallèle ; le moteur
+    # sync (scripts, outils) n'existe que si son module a été importé
+    disposals = []
+    if get_async_engine.cache_info().currsize:
+        disposals.append(get_async_engine().dispose())
+    
+    database_sync = sys.modules.get("app.database_sync")
+    if database_sync is not None and database_sync.get_sync_engine.cache_info().currsize:
+        disposals.append(asyncio.to_thread(database_sync.get_sync_engine().dispose))
     
-    await async_engine.dispose()
-    sync_engine.dispose()
+    await asyncio.gather(*disposals)
     
-    logger.info("Connexions fermées") 
\ No newline at end of file
+    logger.info("Connexions à la base de données fermées", engines=len(disposals))
@@ -0,0 +1,50 @@
+"""Accès synchrone à la base de données (scripts et outils hors requêtes).
+
+Séparé de app.database pour que le processus API, entièrement async,
+n'importe ni ne construise le moteur sync et son driver.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import enable_sqlite_foreign_keys, engine_json_options
+
+
+@lru_cache(maxsize=1)
+def get_sync_engine() -> Engine:
+    """Moteur sync, créé au premier usage."""
+    engine = create_engine(
+        settings.database_url_sync,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        **engine_json_options
+    )
+    enable_sqlite_foreign_keys(engine)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker:
+    """Fabrique de sessions sync liée au moteur sync."""
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=get_sync_engine()
+    )
+
+
+def SessionLocal() -> Session:
+    """Nouvelle session sync (le moteur est créé au premier appel)."""
+    return get_sessionmaker()()
+
+
+def get_sync_session():
+    """Générateur de session sync."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
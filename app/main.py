@@ -1,24 +1,36 @@
 """Application FastAPI principale pour Shopping Monitor."""
 
 from contextlib import asynccontextmanager
+import logging
 import os
 from pathlib import Path
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
+from starlette.datastructures import MutableHeaders
+from sqlalchemy.exc import SQLAlchemyError
+import orjson
 import structlog
 import time
 
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, warm_up_pool
 from app.services.cache_service import cache_service
+from app.services.dataforseo_service import dataforseo_service
+from app.api.scraping import cancel_analysis_tasks
 from app.core.exceptions import ShoppingMonitorException
+from app.core.logging_config import configure_logging, resolve_log_level
 
 
-# Configuration du logger
+# Configuration du logger (avant toute utilisation)
+configure_logging()
 logger = structlog.get_logger()
 
+# Décisions d'environnement résolues une fois à l'import
+IS_PRODUCTION = settings.environment == "production"
+IS_DEBUG = settings.debug
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,16 +41,23 @@ async def lifespan(app: FastAPI):
     try:
         # Initialiser la base de données
         await init_db()
+        await warm_up_pool()
         logger.info("Base de données initialisée")
         
         # Initialiser le cache Redis
         await cache_service.connect()
         
+        # Client HTTP DataForSEO partagé (keep-alive)
+        await dataforseo_service.connect()
+        
         yield
         
     finally:
         # Shutdown
         logger.info("Arrêt de Shopping Monitor")
+        # Les analyses en tâche de fond utilisent le client httpx : les arrêter avant
+        await cancel_analysis_tasks()
+        await dataforseo_service.disconnect()
         await cache_service.disconnect()
         await close_db()
         logger.info("Connexions fermées")
@@ -50,13 +69,14 @@ app = FastAPI(
     description="API de monitoring Google Shopping avec approche projet-centric",
     version="1.0.0",
     root_path=settings.root_path,
-    docs_url="/docs" if settings.debug else None,
-    redoc_url="/redoc" if settings.debug else None,
+    docs_url="/docs" if IS_DEBUG else None,
+    redoc_url="/redoc" if IS_DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Configuration CORS
-if settings.debug:
+if IS_DEBUG:
     # En mode développement, autoriser toutes les origines
     app.add_middleware(
         CORSMiddleware,
@@ -77,77 +97,108 @@ else:
 
 
 # Middleware de logging des requêtes
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Middleware pour logger les requêtes."""
-    start_time = time.time()
-    
-    # Informations de la requête
-    client_ip = request.client.host if request.client else "unknown"
-    method = request.method
-    url = str(request.url)
-    
-    logger.info(
-        "Requête reçue",
-        method=method,
-        url=url,
-        client_ip=client_ip
-    )
-    
-    # Traitement de la requête
-    response = await call_next(request)
-    
-    # Calcul du temps de traitement
-    process_time = time.time() - start_time
-    
-    logger.info(
-        "Requête traitée",
-        method=method,
-        url=url,
-        status_code=response.status_code,
-        process_time=f"{process_time:.3f}s"
-    )
+# Niveau résolu une fois : sous INFO, aucun événement n'est construit par requête
+_LOG_REQUESTS = resolve_log_level() <= logging.INFO
+
+
+class RequestLoggingMiddleware:
+    """Middleware ASGI : temps de traitement et une seule ligne de log par requête.
+
+    Implémenté en ASGI pur plutôt qu'avec @app.middleware("http") pour éviter
+    le task group et le flux mémoire que BaseHTTPMiddleware crée à chaque requête.
+    """
     
-    # Ajouter le temps de traitement aux headers
-    response.headers["X-Process-Time"] = str(process_time)
+    def __init__(self, app):
+        self.app = app
     
-    return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter_ns()
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Calcul du temps de traitement (horloge monotone, en millisecondes)
+                process_time_ms = (time.perf_counter_ns() - start) / 1_000_000
+                
+                # Les path_params sont ajoutés au scope par le routeur
+                if _LOG_REQUESTS:
+                    client = scope.get("client")
+                    logger.info(
+                        "Requête traitée",
+                        method=scope["method"],
+                        path=scope["path"],
+                        status_code=message["status"],
+                        duration_ms=round(process_time_ms, 2),
+                        project_id=scope.get("path_params", {}).get("project_id"),
+                        client_ip=client[0] if client else "unknown"
+                    )
+                
+                # Ajouter le temps de traitement aux headers
+                MutableHeaders(scope=message).append("X-Process-Time", f"{process_time_ms:.3f}")
+            
+            await send(message)
+        
+        await self.app(scope, receive, send_with_timing)
+
+
+app.add_middleware(RequestLoggingMiddleware)
 
 
 # Gestionnaire d'exceptions global
-@app.exception_handler(ShoppingMonitorException)
-async def shopping_monitor_exception_handler(request: Request, exc: ShoppingMonitorException):
-    """Gestionnaire pour les exceptions métier."""
-    logger.error(
-        "Erreur métier",
-        error_type=exc.__class__.__name__,
-        error_message=str(exc),
-        url=str(request.url)
-    )
-    
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "error": exc.error_type,
-            "message": exc.message,
-            "details": exc.details
-        }
-    )
 
 
-@app.exception_handler(Exception)
-async def general_exception_handler(request: Request, exc: Exception):
-    """Gestionnaire pour les exceptions générales."""
+async def exception_handler(request: Request, exc: Exception):
+    """Gestionnaire unique : exceptions métier, erreurs base de données et inattendues."""
+    if isinstance(exc, ShoppingMonitorException):
+        logger.error(
+            "Erreur métier",
+            error_type=exc.__class__.__name__,
+            error_message=str(exc),
+            path=request.url.path
+        )
+        
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={
+                "error": exc.error_type,
+                "message": exc.message,
+                "details": exc.details
+            }
+        )
+    
+    # La trace complète n'est formatée qu'hors production
+    exc_info = None if IS_PRODUCTION else (type(exc), exc, exc.__traceback__)
+    
+    if isinstance(exc, SQLAlchemyError):
+        logger.error(
+            "Erreur base de données",
+            error_type=exc.__class__.__name__,
+            path=request.url.path,
+            exc_info=exc_info
+        )
+        
+        # Le message SQLAlchemy contient la requête et ses paramètres : ne jamais l'exposer
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": "DatabaseError",
+                "message": "Erreur lors de l'accès à la base de données"
+            }
+        )
+    
     logger.error(
         "Erreur inattendue",
         error_type=exc.__class__.__name__,
         error_message=str(exc),
-        url=str(request.url),
-        exc_info=True
+        path=request.url.path,
+        exc_info=exc_info
     )
     
     # En production, ne pas exposer les détails techniques
-    if settings.environment == "production":
+    if IS_PRODUCTION:
         return JSONResponse(
             status_code=500,
             content={
@@ -155,36 +206,47 @@ async def general_exception_handler(request: Request, exc: Exception):
                 "message": "Une erreur inattendue s'est produite"
             }
         )
-    else:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": exc.__class__.__name__,
-                "message": str(exc)
-            }
-        )
+    
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": exc.__class__.__name__,
+            "message": str(exc)
+        }
+    )
+
+
+# Les exceptions métier et SQLAlchemy restent enregistrées explicitement : le
+# gestionnaire de Exception seul s'exécute dans ServerErrorMiddleware, qui relance
+# l'exception après avoir répondu
+for _exception_class in (ShoppingMonitorException, SQLAlchemyError, Exception):
+    app.add_exception_handler(_exception_class, exception_handler)
 
 
 # Routes de base
+# Corps constants sérialisés une seule fois ; seul le timestamp de /health varie
+_ROOT_BODY = orjson.dumps({
+    "message": "Shopping Monitor API",
+    "version": "1.0.0",
+    "environment": settings.environment,
+    "docs": "/docs" if IS_DEBUG else "disabled"
+})
+_HEALTH_PREFIX = orjson.dumps({"status": "healthy", "environment": settings.environment})[:-1]
+
+
 @app.get("/")
 async def root():
     """Endpoint racine."""
-    return {
-        "message": "Shopping Monitor API",
-        "version": "1.0.0",
-        "environment": settings.environment,
-        "docs": "/docs" if settings.debug else "disabled"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Endpoint de vérification de santé."""
-    return {
-        "status": "healthy",
-        "environment": settings.environment,
-        "timestamp": time.time()
-    }
+    return Response(
+        content=_HEALTH_PREFIX + b',"timestamp":' + repr(time.time()).encode() + b"}",
+        media_type="application/json"
+    )
 
 
 # Import et inclusion des routes
@@ -213,23 +275,28 @@ static_dir = Path("/app/static")
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
     
+    # Résolus une seule fois au démarrage
+    # /docs et /redoc n'existent qu'en debug : en production ce sont des routes frontend
+    _NON_FRONTEND_PREFIXES = ("api/", "docs", "redoc") if IS_DEBUG else ("api/",)
+    _INDEX_FILE = static_dir / "index.html"
+    _INDEX_EXISTS = _INDEX_FILE.is_file()
+    
     # Route pour servir l'index.html sur toutes les routes frontend
     @app.get("/{path:path}")
     async def serve_frontend(path: str):
         """Servir le frontend React pour toutes les routes non-API."""
         # Éviter de servir l'index pour les routes API
-        if path.startswith("api/") or path.startswith("docs") or path.startswith("redoc"):
+        if path.startswith(_NON_FRONTEND_PREFIXES):
             raise HTTPException(status_code=404, detail="Not found")
         
-        # Si c'est un fichier statique, le laisser passer
+        # Si c'est un fichier statique, le laisser passer (un seul stat)
         static_file = static_dir / path
-        if static_file.exists() and static_file.is_file():
+        if static_file.is_file():
             return FileResponse(static_file)
         
         # Sinon, servir index.html pour le routing React
-        index_file = static_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(index_file)
+        if _INDEX_EXISTS:
+            return FileResponse(_INDEX_FILE)
         
         raise HTTPException(status_code=404, detail="Frontend not found")
 
@@ -240,6 +307,8 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        reload=IS_DEBUG,
         log_level=settings.log_level.lower()
     ) 
\ No newline at end of file
@@ -7,8 +7,10 @@ import time
 
 from app.config import settings
 from app.core.exceptions import ShoppingMonitorException
+from app.core.logging_config import configure_logging
 
 # Configuration du logger
+configure_logging()
 logger = structlog.get_logger()
 
 # Création de l'application FastAPI
@@ -1,16 +1,51 @@
 """Modèles SQLAlchemy pour Shopping Monitor."""
 
-from app.models.project import Project
-from app.models.competitor import Competitor
-from app.models.keyword import Keyword
-from app.models.serp_result import SerpResult
-from app.models.unique_url import UniqueUrl, SerpUrlMapping
+import importlib
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+# Modèles réexportés à la demande (PEP 562) : seul le module du modèle demandé est importé
+_LAZY_MODELS = {
+    "Project": "app.models.project",
+    "Competitor": "app.models.competitor",
+    "Keyword": "app.models.keyword",
+    "SerpResult": "app.models.serp_result",
+    "SerpResultRaw": "app.models.serp_result",
+    "UniqueUrl": "app.models.unique_url",
+    "SerpUrlMapping": "app.models.unique_url",
+}
 
 __all__ = [
     "Project",
-    "Competitor", 
+    "Competitor",
     "Keyword",
     "SerpResult",
+    "SerpResultRaw",
     "UniqueUrl",
     "SerpUrlMapping",
-] 
\ No newline at end of file
+    "load_all_models",
+]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_MODELS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    model = getattr(importlib.import_module(module_name), name)
+    globals()[name] = model
+    return model
+
+
+def load_all_models() -> None:
+    """Importer tous les modèles (requis par create_all et la résolution des relations)."""
+    for module_name in set(_LAZY_MODELS.values()):
+        importlib.import_module(module_name)
+
+
+# Les relations sont déclarées par nom de classe : tous les modèles doivent être
+# enregistrés avant la configuration des mappers (premier usage d'un modèle)
+@event.listens_for(Mapper, "before_configured")
+def _load_models_before_configure():
+    load_all_models()
@@ -4,10 +4,12 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.models.domain import normalize_domain, normalize_domain_expression
 
 
 class Competitor(Base):
@@ -19,8 +21,7 @@ class Competitor(Base):
     id = Column(
         String(36),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True
+        default=lambda: str(uuid.uuid4())
     )
     project_id = Column(
         String(36),
@@ -76,21 +77,23 @@ class Competitor(Base):
         brand_info = f", main_brand={self.is_main_brand}" if self.is_main_brand else ""
         return f"<Competitor(id={self.id}, name='{self.name}', domain='{self.domain}'{brand_info})>"
     
-    @property
+    @hybrid_property
     def display_name(self) -> str:
         """Nom d'affichage du concurrent."""
         return self.brand_name if self.brand_name else self.name
     
-    @property
+    @display_name.expression
+    def display_name(cls):
+        """Nom d'affichage calculé par la base (une seule colonne sélectionnée)."""
+        # NULLIF : une marque vide retombe sur le nom, comme côté Python
+        return func.coalesce(func.nullif(cls.brand_name, ""), cls.name)
+    
+    @hybrid_property
     def clean_domain(self) -> str:
         """Domaine nettoyé (sans www, http, etc.)."""
-        domain = self.domain.lower()
-        # Supprimer les préfixes communs
-        prefixes = ['https://', 'http://', 'www.']
-        for prefix in prefixes:
-            if domain.startswith(prefix):
-                domain = domain[len(prefix):]
-        # Supprimer le slash final
-        if domain.endswith('/'):
-            domain = domain[:-1]
-        return domain 
\ No newline at end of file
+        return normalize_domain(self.domain)
+    
+    @clean_domain.expression
+    def clean_domain(cls):
+        """Domaine nettoyé calculé par la base (filtre, GROUP BY)."""
+        return normalize_domain_expression(cls.domain) 
\ No newline at end of file
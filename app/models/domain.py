@@ -0,0 +1,57 @@
+"""Normalisation des domaines partagée par les modèles (Python et SQL)."""
+
+import re
+from functools import lru_cache
+
+from sqlalchemy import case, func
+from sqlalchemy.sql.elements import ColumnElement
+
+# Préfixes retirés en tête d'un domaine : un schéma au plus, puis « www. »
+URL_SCHEMES = ("https://", "http://")
+WWW_PREFIX = "www."
+
+# Mêmes préfixes en une seule expression (appliquée à une chaîne en minuscules)
+_DOMAIN_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.)?")
+
+# Partie réseau d'une URL (équivalent de urlparse(url).netloc sans ParseResult)
+_URL_NETLOC_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*:)?//([^/?#]*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_domain(domain: str) -> str:
+    """Domaine nettoyé (sans www, http, etc.), mémorisé par valeur."""
+    # Supprimer les préfixes puis le slash final
+    return _DOMAIN_PREFIX_RE.sub("", domain.lower(), 1).removesuffix("/")
+
+
+def url_netloc(url: str) -> str:
+    """Hôte d'une URL en minuscules (chaîne vide si l'URL n'en a pas)."""
+    if not url:
+        return ""
+    match = _URL_NETLOC_RE.match(url)
+    return match.group(1).lower() if match else ""
+
+
+def _strip_leading(expression: ColumnElement, *prefixes: str) -> ColumnElement:
+    """Retire en tête le premier des préfixes présent (au plus un)."""
+    return case(
+        *(
+            (expression.startswith(prefix), func.substr(expression, len(prefix) + 1))
+            for prefix in prefixes
+        ),
+        else_=expression
+    )
+
+
+def normalize_domain_expression(column: ColumnElement) -> ColumnElement:
+    """Équivalent SQL de normalize_domain, pour filtrer ou grouper côté base.
+
+    Comme l'expression régulière, les préfixes ne sont retirés qu'en tête et
+    un seul slash final est supprimé.
+    """
+    expression = _strip_leading(func.lower(column), *URL_SCHEMES)
+    expression = _strip_leading(expression, WWW_PREFIX)
+    return case(
+        (expression.endswith("/"), func.substr(expression, 1, func.length(expression) - 1)),
+        else_=expression
+    )
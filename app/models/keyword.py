@@ -19,8 +19,7 @@ class Keyword(Base):
     id = Column(
         String(36),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True
+        default=lambda: str(uuid.uuid4())
     )
     project_id = Column(
         String(36),
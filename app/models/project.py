@@ -4,11 +4,13 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Index, select
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.models.competitor import Competitor
+from app.models.keyword import Keyword
 
 
 class Project(Base):
@@ -20,8 +22,7 @@ class Project(Base):
     id = Column(
         String(36),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True
+        default=lambda: str(uuid.uuid4())
     )
     name = Column(
         String(255),
@@ -56,14 +57,12 @@ class Project(Base):
     competitors = relationship(
         "Competitor",
         back_populates="project",
-        cascade="all, delete-orphan",
-        lazy="selectin"
+        cascade="all, delete-orphan"
     )
     keywords = relationship(
         "Keyword",
         back_populates="project",
-        cascade="all, delete-orphan",
-        lazy="selectin"
+        cascade="all, delete-orphan"
     )
     serp_results = relationship(
         "SerpResult",
@@ -71,23 +70,39 @@ class Project(Base):
         cascade="all, delete-orphan"
     )
     
-    def __repr__(self) -> str:
-        return f"<Project(id={self.id}, name='{self.name}', active={self.is_active})>"
-    
-    @property
-    def competitors_count(self) -> int:
-        """Nombre de concurrents dans le projet."""
-        return len(self.competitors) if self.competitors else 0
+    # Agrégats calculés par la base (sous-requêtes corrélées), différés :
+    # chargés uniquement avec undefer() par les routes qui les exposent
+    competitors_count = column_property(
+        select(func.count(Competitor.id))
+        .where(Competitor.project_id == id)
+        .correlate_except(Competitor)
+        .scalar_subquery(),
+        deferred=True
+    )
+    keywords_count = column_property(
+        select(func.count(Keyword.id))
+        .where(Keyword.project_id == id, Keyword.is_active == True)
+        .correlate_except(Keyword)
+        .scalar_subquery(),
+        deferred=True
+    )
+    # Marque principale : son id seulement, sans charger la collection competitors
+    main_brand_id = column_property(
+        select(Competitor.id)
+        .where(Competitor.project_id == id, Competitor.is_main_brand == True)
+        .correlate_except(Competitor)
+        .limit(1)
+        .scalar_subquery(),
+        deferred=True
+    )
     
-    @property
-    def keywords_count(self) -> int:
-        """Nombre de mots-clés dans le projet."""
-        return len([k for k in self.keywords if k.is_active]) if self.keywords else 0
+    # Index pour la pagination par curseur (created_at DESC, id DESC)
+    __table_args__ = (
+        Index(
+            'idx_projects_created_at_id',
+            created_at.desc(), id.desc()
+        ),
+    )
     
-    @property
-    def main_brand(self):
-        """Récupère la marque principale du projet."""
-        if self.competitors:
-            main_brands = [c for c in self.competitors if c.is_main_brand]
-            return main_brands[0] if main_brands else None
-        return None 
\ No newline at end of file
+    def __repr__(self) -> str:
+        return f"<Project(id={self.id}, name='{self.name}', active={self.is_active})>" 
\ No newline at end of file
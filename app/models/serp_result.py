@@ -4,14 +4,24 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index, JSON
-from sqlalchemy import DECIMAL
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, SmallInteger, DateTime, ForeignKey, Text, Index
+from sqlalchemy import DECIMAL, case, text, true
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 # Modèle adapté pour SQLite
 
-from app.database import Base
+from app.database import Base, JSONDocument
+
+
+# Tables de correspondance des propriétés d'affichage (construites une seule fois)
+CURRENCY_SYMBOLS = {
+    'EUR': '€',
+    'USD': '$',
+    'GBP': '£'
+}
+AVAILABLE_STATUSES = frozenset({'in_stock', 'available', 'in stock'})
 
 
 class SerpResult(Base):
@@ -23,8 +33,7 @@ class SerpResult(Base):
     id = Column(
         String(36),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True
+        default=lambda: str(uuid.uuid4())
     )
     project_id = Column(
         String(36),
@@ -51,33 +60,43 @@ class SerpResult(Base):
         index=True
     )
     
-    # Données ranking DataForSEO
+    # Données ranking DataForSEO (positions 1-100 : un SMALLINT suffit).
+    # Les colonnes texte larges sont différées dans le groupe "detail" :
+    # absentes des chargements d'entités, chargées via undefer_group("detail")
     position = Column(
-        Integer,
-        nullable=True,
-        index=True
-    )
-    url = Column(
-        Text,
+        SmallInteger,
         nullable=True
     )
+    url = deferred(
+        Column(
+            Text,
+            nullable=True
+        ),
+        group="detail"
+    )
     domain = Column(
         String(255),
-        nullable=True,
-        index=True
-    )
-    title = Column(
-        Text,
         nullable=True
     )
-    description = Column(
-        Text,
-        nullable=True
+    title = deferred(
+        Column(
+            Text,
+            nullable=True
+        ),
+        group="detail"
+    )
+    description = deferred(
+        Column(
+            Text,
+            nullable=True
+        ),
+        group="detail"
     )
     
-    # Données produit
+    # Données produit (colonnes DECIMAL inchangées, lues en float : pas d'objets
+    # Decimal à construire par ligne ni d'arithmétique Decimal dans les analytics)
     price = Column(
-        DECIMAL(10, 2),
+        DECIMAL(10, 2, asdecimal=False),
         nullable=True,
         index=True
     )
@@ -86,11 +105,11 @@ class SerpResult(Base):
         nullable=True
     )
     price_original = Column(
-        DECIMAL(10, 2),
+        DECIMAL(10, 2, asdecimal=False),
         nullable=True
     )
     discount_percentage = Column(
-        Integer,
+        SmallInteger,
         nullable=True
     )
     availability = Column(
@@ -108,14 +127,17 @@ class SerpResult(Base):
         nullable=True,
         index=True
     )
-    merchant_url = Column(
-        Text,
-        nullable=True
+    merchant_url = deferred(
+        Column(
+            Text,
+            nullable=True
+        ),
+        group="detail"
     )
     
     # Données engagement
     rating = Column(
-        DECIMAL(3, 2),
+        DECIMAL(3, 2, asdecimal=False),
         nullable=True
     )
     reviews_count = Column(
@@ -124,19 +146,12 @@ class SerpResult(Base):
     )
     
     # Données visuelles
-    image_url = Column(
-        Text,
-        nullable=True
-    )
-    additional_images = Column(
-        JSON,
-        nullable=True
-    )
-    
-    # Données brutes complètes DataForSEO
-    raw_data = Column(
-        JSON,
-        nullable=True
+    image_url = deferred(
+        Column(
+            Text,
+            nullable=True
+        ),
+        group="detail"
     )
     
     # Relations
@@ -152,6 +167,16 @@ class SerpResult(Base):
         "Competitor",
         back_populates="serp_results"
     )
+    # Données volumineuses isolées dans serp_result_raw, chargées explicitement
+    # (selectinload(SerpResult.raw)) par les vues de détail uniquement
+    raw = relationship(
+        "SerpResultRaw",
+        uselist=False,
+        back_populates="serp_result",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
+    )
     
     # Index composites pour performance
     __table_args__ = (
@@ -163,14 +188,31 @@ class SerpResult(Base):
             'idx_serp_competitor_scraped',
             'competitor_id', 'scraped_at'
         ),
-        Index(
-            'idx_serp_position_scraped',
-            'position', 'scraped_at'
-        ),
         Index(
             'idx_serp_domain_scraped',
             'domain', 'scraped_at'
         ),
+        # Index couvrant des agrégats analytics (share of voice, matrice) filtrés
+        # par projet et période : lecture de l'index seul, sans accès à la table
+        Index(
+            'idx_serp_project_scraped_covering',
+            'project_id', 'scraped_at', 'domain', 'position', 'competitor_id', 'keyword_id'
+        ),
+        # Index partiel des positions de première page (opportunités 11-20, tops)
+        Index(
+            'idx_serp_top_positions',
+            'project_id', 'scraped_at', 'domain', 'position',
+            postgresql_where=text('position <= 20'),
+            sqlite_where=text('position <= 20')
+        ),
+        # Index partiel des produits en promotion (opportunités d'avantage prix) :
+        # SerpResult.has_discount filtre côté base sur un parcours d'index
+        Index(
+            'idx_serp_project_discounted',
+            'project_id', 'scraped_at',
+            postgresql_where=text('price < price_original'),
+            sqlite_where=text('price < price_original')
+        ),
     )
     
     def __repr__(self) -> str:
@@ -184,15 +226,11 @@ class SerpResult(Base):
         if not self.price:
             return "N/A"
         
-        currency_symbol = {
-            'EUR': '€',
-            'USD': '$',
-            'GBP': '£'
-        }.get(self.currency, self.currency or '')
+        currency_symbol = CURRENCY_SYMBOLS.get(self.currency, self.currency or '')
         
         return f"{self.price:.2f} {currency_symbol}".strip()
     
-    @property
+    @hybrid_property
     def has_discount(self) -> bool:
         """Vérifie si le produit a une réduction."""
         return (
@@ -201,6 +239,11 @@ class SerpResult(Base):
             self.price < self.price_original
         )
     
+    @has_discount.expression
+    def has_discount(cls):
+        # NULL < x est NULL : la comparaison seule écarte les prix manquants
+        return cls.price < cls.price_original
+    
     @property
     def calculated_discount_percentage(self) -> int:
         """Calcule le pourcentage de réduction si pas fourni."""
@@ -224,11 +267,57 @@ class SerpResult(Base):
             return f"{rating_str} ({self.reviews_count} avis)"
         return rating_str
     
-    @property
+    @hybrid_property
     def is_available(self) -> bool:
         """Vérifie si le produit est disponible."""
         if self.availability:
-            return self.availability.lower() in ['in_stock', 'available', 'in stock']
+            return self.availability.lower() in AVAILABLE_STATUSES
         if self.stock_status:
-            return self.stock_status.lower() in ['in_stock', 'available', 'in stock']
-        return True  # Par défaut, considérer comme disponible 
\ No newline at end of file
+            return self.stock_status.lower() in AVAILABLE_STATUSES
+        return True  # Par défaut, considérer comme disponible
+    
+    @is_available.expression
+    def is_available(cls):
+        statuses = sorted(AVAILABLE_STATUSES)
+        return case(
+            (func.coalesce(cls.availability, '') != '', func.lower(cls.availability).in_(statuses)),
+            (func.coalesce(cls.stock_status, '') != '', func.lower(cls.stock_status).in_(statuses)),
+            else_=true()
+        )
+
+
+class SerpResultRaw(Base):
+    """Données brutes d'un résultat SERP (relation 1:1 avec serp_results).
+
+    Séparées de serp_results pour garder des lignes étroites sur la table
+    parcourue par les agrégats analytics.
+    """
+    
+    __tablename__ = "serp_result_raw"
+    
+    serp_result_id = Column(
+        String(36),
+        ForeignKey("serp_results.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    
+    # Données visuelles
+    additional_images = Column(
+        JSONDocument,
+        nullable=True
+    )
+    
+    # Données brutes complètes DataForSEO
+    raw_data = Column(
+        JSONDocument,
+        nullable=True
+    )
+    
+    # Relations
+    serp_result = relationship(
+        "SerpResult",
+        back_populates="raw"
+    )
+    
+    def __repr__(self) -> str:
+        return f"<SerpResultRaw(serp_result_id={self.serp_result_id})>"
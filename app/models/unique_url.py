@@ -3,13 +3,15 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 # Modèle adapté pour SQLite
 
-from app.database import Base
+from app.database import Base, JSONDocument
+from app.models.domain import normalize_domain, normalize_domain_expression, url_netloc
 
 
 class UniqueUrl(Base):
@@ -21,8 +23,7 @@ class UniqueUrl(Base):
     id = Column(
         String(36),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
-        index=True
+        default=lambda: str(uuid.uuid4())
     )
     url = Column(
         Text,
@@ -40,7 +41,7 @@ class UniqueUrl(Base):
         nullable=True
     )
     product_data = Column(
-        JSON,
+        JSONDocument,
         nullable=True,
         comment="Données scrapées (prix, images, etc.)"
     )
@@ -61,22 +62,17 @@ class UniqueUrl(Base):
     def __repr__(self) -> str:
         return f"<UniqueUrl(id={self.id}, domain='{self.domain}', status='{self.scraping_status}')>"
     
-    @property
+    @hybrid_property
     def clean_domain(self) -> str:
         """Domaine nettoyé (sans www, http, etc.)."""
         if not self.domain:
             return ""
-        
-        domain = self.domain.lower()
-        # Supprimer les préfixes communs
-        prefixes = ['https://', 'http://', 'www.']
-        for prefix in prefixes:
-            if domain.startswith(prefix):
-                domain = domain[len(prefix):]
-        # Supprimer le slash final
-        if domain.endswith('/'):
-            domain = domain[:-1]
-        return domain
+        return normalize_domain(self.domain)
+    
+    @clean_domain.expression
+    def clean_domain(cls):
+        """Domaine nettoyé calculé par la base (filtre, GROUP BY)."""
+        return func.coalesce(normalize_domain_expression(cls.domain), "")
     
     @property
     def is_scraped(self) -> bool:
@@ -93,14 +89,7 @@ class UniqueUrl(Base):
         if not self.url:
             return
         
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(self.url)
-            self.domain = parsed.netloc.lower()
-        except Exception:
-            # En cas d'erreur, essayer une extraction simple
-            if '://' in self.url:
-                self.domain = self.url.split('://')[1].split('/')[0].lower()
+        self.domain = url_netloc(self.url)
 
 
 class SerpUrlMapping(Base):
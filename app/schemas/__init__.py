@@ -1,4 +1,9 @@
-"""Schemas Pydantic pour Shopping Monitor."""
+"""Schemas Pydantic pour Shopping Monitor.
+
+Les routes qui lisent le corps elles-mêmes le valident brut avec
+Model.model_validate_json(await request.body()) plutôt que
+Model(**await request.json()) : pydantic-core analyse et valide en une passe.
+"""
 
 from app.schemas.project_schemas import (
     ProjectBase,
@@ -20,6 +25,7 @@ from app.schemas.competitor_schemas import (
 from app.schemas.keyword_schemas import (
     KeywordBase,
     KeywordCreate,
+    KeywordBulkCreate,
     KeywordUpdate,
     KeywordResponse,
     KeywordListResponse
@@ -52,6 +58,7 @@ __all__ = [
     # Keyword schemas
     "KeywordBase",
     "KeywordCreate",
+    "KeywordBulkCreate",
     "KeywordUpdate",
     "KeywordResponse", 
     "KeywordListResponse",
@@ -2,10 +2,10 @@
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_serializer
 
 
 class PeriodType(str, Enum):
@@ -45,11 +45,6 @@ class ShareOfVoiceResponse(BaseModel):
     period_end: datetime
     total_appearances: int
     competitors: List[ShareOfVoiceItem]
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 # Schémas pour Position Matrix
@@ -63,7 +58,7 @@ class PositionMatrixItem(BaseModel):
     )
     best_position: Optional[int] = Field(description="Meilleure position trouvée")
     worst_position: Optional[int] = Field(description="Pire position trouvée")
-    opportunity_score: float = Field(description="Score d'opportunité (0-1)")
+    opportunity_score: float = Field(description="Score d'opportunité (0-100)")
 
 
 class PositionMatrixResponse(BaseModel):
@@ -73,11 +68,6 @@ class PositionMatrixResponse(BaseModel):
     period_end: datetime
     keywords: List[PositionMatrixItem]
     competitor_domains: List[str] = Field(description="Liste des domaines concurrents")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 # Schémas pour les opportunités
@@ -113,11 +103,6 @@ class OpportunitiesResponse(BaseModel):
     medium_priority: int
     low_priority: int
     opportunities: List[OpportunityItem]
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 # Schémas pour comparaisons concurrents
@@ -142,11 +127,6 @@ class CompetitorComparison(BaseModel):
     competitors: List[CompetitorMetrics]
     period_start: datetime
     period_end: datetime
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 # Schémas pour analyse de tendances
@@ -174,12 +154,6 @@ class TrendAnalysisResponse(BaseModel):
     period_end: date
     period_type: PeriodType
     keywords_trends: List[KeywordTrend]
-    
-    class Config:
-        json_encoders = {
-            date: lambda v: v.isoformat(),
-            datetime: lambda v: v.isoformat()
-        }
 
 
 # Schémas pour le dashboard
@@ -192,11 +166,40 @@ class DashboardMetrics(BaseModel):
     total_opportunities: int
     visibility_score: Optional[float]
     last_scrape_date: Optional[datetime]
+
+
+class TopKeyword(BaseModel):
+    """Mot-clé du top dashboard."""
+    keyword: str
+    position: Optional[int]
+    volume: int
+    trend: str
+    note: Optional[str] = None
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    @model_serializer(mode="wrap")
+    def _omit_empty_note(self, handler):
+        """N'émet la clé note que lorsqu'elle est renseignée (comme les dicts d'origine)."""
+        data = handler(self)
+        if data.get("note") is None:
+            data.pop("note", None)
+        return data
+
+
+class TopCompetitor(BaseModel):
+    """Concurrent du top dashboard."""
+    name: str
+    domain: str
+    share_of_voice: float
+    avg_position: Optional[float]
+    trend: str
+
+
+class RecentChange(BaseModel):
+    """Changement récent affiché sur le dashboard."""
+    type: str
+    keyword: str
+    change: str
+    date: str
 
 
 class DashboardResponse(BaseModel):
@@ -204,14 +207,9 @@ class DashboardResponse(BaseModel):
     project_id: str
     project_name: str
     metrics: DashboardMetrics
-    top_keywords: List[Dict[str, Any]] = Field(description="Top 5 mots-clés par performance")
-    top_competitors: List[Dict[str, Any]] = Field(description="Top 5 concurrents par visibilité")
-    recent_changes: List[Dict[str, Any]] = Field(description="Changements récents")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    top_keywords: List[TopKeyword] = Field(description="Top 5 mots-clés par performance")
+    top_competitors: List[TopCompetitor] = Field(description="Top 5 concurrents par visibilité")
+    recent_changes: List[RecentChange] = Field(description="Changements récents")
 
 
 # Schémas pour les requêtes
@@ -222,6 +220,11 @@ class AnalyticsRequest(BaseModel):
     period_end: Optional[datetime] = Field(default=None, description="Fin de période (défaut: maintenant)")
 
 
+class DashboardBatchRequest(BaseModel):
+    """Requête dashboard pour plusieurs projets."""
+    project_ids: List[str] = Field(..., min_length=1, max_length=50, description="IDs des projets (50 max)")
+
+
 class TrendRequest(AnalyticsRequest):
     """Requête pour analyse de tendances."""
     period_type: PeriodType = Field(default=PeriodType.DAY)
@@ -1,11 +1,28 @@
 """Schemas Pydantic pour les analytics."""
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID
-from decimal import Decimal
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, computed_field
+
+from app.models.serp_result import AVAILABLE_STATUSES, CURRENCY_SYMBOLS
+
+# Réponses construites une fois à partir des lignes ORM et jamais modifiées
+# (champs inconnus refusés : pas de stockage des extras par instance)
+_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="forbid",
+    validate_assignment=False,
+    revalidate_instances="never"
+)
+
+
+# Lignes déjà construites par la couche service : seule la liste est vérifiée,
+# ses éléments (Any) ne sont pas parcourus clé par clé par pydantic-core
+Rows = List[Any]
 
 
 class SerpResultResponse(BaseModel):
@@ -25,9 +42,9 @@ class SerpResultResponse(BaseModel):
     description: Optional[str] = Field(None, description="Description")
     
     # Données produit
-    price: Optional[Decimal] = Field(None, ge=0, description="Prix")
+    price: Optional[float] = Field(None, ge=0, description="Prix")
     currency: Optional[str] = Field(None, description="Devise")
-    price_original: Optional[Decimal] = Field(None, ge=0, description="Prix original")
+    price_original: Optional[float] = Field(None, ge=0, description="Prix original")
     discount_percentage: Optional[int] = Field(None, ge=0, le=100, description="Pourcentage de réduction")
     availability: Optional[str] = Field(None, description="Disponibilité")
     stock_status: Optional[str] = Field(None, description="Statut du stock")
@@ -37,21 +54,69 @@ class SerpResultResponse(BaseModel):
     merchant_url: Optional[str] = Field(None, description="URL du marchand")
     
     # Données engagement
-    rating: Optional[Decimal] = Field(None, ge=0, le=5, description="Note")
+    rating: Optional[float] = Field(None, ge=0, le=5, description="Note")
     reviews_count: Optional[int] = Field(None, ge=0, description="Nombre d'avis")
     
     # Données visuelles
     image_url: Optional[str] = Field(None, description="URL de l'image")
-    additional_images: Optional[Dict[str, Any]] = Field(None, description="Images supplémentaires")
-    
-    # Propriétés calculées
-    formatted_price: str = Field(..., description="Prix formaté")
-    has_discount: bool = Field(..., description="A une réduction")
-    calculated_discount_percentage: int = Field(..., description="Pourcentage de réduction calculé")
-    rating_display: str = Field(..., description="Note formatée")
-    is_available: bool = Field(..., description="Est disponible")
-    
-    model_config = ConfigDict(from_attributes=True)
+    additional_images: Optional[Any] = Field(None, description="Images supplémentaires")
+    
+    model_config = _RESPONSE_CONFIG
+    
+    # Propriétés calculées à la première lecture (ou à la sérialisation), puis mémorisées
+    @computed_field(description="Prix formaté")
+    @cached_property
+    def formatted_price(self) -> str:
+        if not self.price:
+            return "N/A"
+        currency_symbol = CURRENCY_SYMBOLS.get(self.currency, self.currency or '')
+        return f"{self.price:.2f} {currency_symbol}".strip()
+    
+    @computed_field(description="A une réduction")
+    @cached_property
+    def has_discount(self) -> bool:
+        return (
+            self.price_original is not None and
+            self.price is not None and
+            self.price < self.price_original
+        )
+    
+    @computed_field(description="Pourcentage de réduction calculé")
+    @cached_property
+    def calculated_discount_percentage(self) -> int:
+        if self.discount_percentage:
+            return self.discount_percentage
+        if self.has_discount:
+            return int(round((self.price_original - self.price) / self.price_original * 100))
+        return 0
+    
+    @computed_field(description="Note formatée")
+    @cached_property
+    def rating_display(self) -> str:
+        if not self.rating:
+            return "N/A"
+        rating_str = f"{self.rating:.1f}"
+        if self.reviews_count:
+            return f"{rating_str} ({self.reviews_count} avis)"
+        return rating_str
+    
+    @computed_field(description="Est disponible")
+    @cached_property
+    def is_available(self) -> bool:
+        if self.availability:
+            return self.availability.lower() in AVAILABLE_STATUSES
+        if self.stock_status:
+            return self.stock_status.lower() in AVAILABLE_STATUSES
+        return True
+    
+    @classmethod
+    def validate_many(cls, rows: Iterable[Any]) -> List["SerpResultResponse"]:
+        """Valide un lot de lignes (objets ORM ou dicts) en un seul appel pydantic-core."""
+        return SerpResultListAdapter.validate_python(rows, from_attributes=True)
+
+
+# Validateur de liste construit une seule fois (SerpResultResponse.validate_many)
+SerpResultListAdapter = TypeAdapter(List[SerpResultResponse])
 
 
 class AnalyticsResponse(BaseModel):
@@ -87,6 +152,8 @@ class AnalyticsResponse(BaseModel):
     
     # Données temporelles
     last_update: datetime = Field(..., description="Dernière mise à jour")
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class ShareOfVoiceResponse(BaseModel):
@@ -96,13 +163,13 @@ class ShareOfVoiceResponse(BaseModel):
     date_range: Dict[str, datetime] = Field(..., description="Plage de dates")
     
     # Part de voix par concurrent
-    competitors_share: List[Dict[str, Any]] = Field(
+    competitors_share: Rows = Field(
         default_factory=list,
         description="Part de voix par concurrent"
     )
     
     # Évolution temporelle
-    timeline: List[Dict[str, Any]] = Field(
+    timeline: Rows = Field(
         default_factory=list,
         description="Évolution de la part de voix dans le temps"
     )
@@ -121,6 +188,8 @@ class ShareOfVoiceResponse(BaseModel):
     market_concentration: Optional[float] = Field(
         None, ge=0.0, le=100.0, description="Concentration du marché"
     )
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class PositionMatrixResponse(BaseModel):
@@ -130,19 +199,19 @@ class PositionMatrixResponse(BaseModel):
     date_range: Dict[str, datetime] = Field(..., description="Plage de dates")
     
     # Matrice positions (keyword x competitor)
-    matrix: List[Dict[str, Any]] = Field(
+    matrix: Rows = Field(
         default_factory=list,
         description="Matrice des positions"
     )
     
     # Statistiques par mot-clé
-    keywords_stats: List[Dict[str, Any]] = Field(
+    keywords_stats: Rows = Field(
         default_factory=list,
         description="Statistiques par mot-clé"
     )
     
     # Statistiques par concurrent
-    competitors_stats: List[Dict[str, Any]] = Field(
+    competitors_stats: Rows = Field(
         default_factory=list,
         description="Statistiques par concurrent"
     )
@@ -152,6 +221,8 @@ class PositionMatrixResponse(BaseModel):
     average_position: Optional[float] = Field(None, ge=1.0, description="Position moyenne")
     best_performing_keyword: Optional[str] = Field(None, description="Meilleur mot-clé")
     worst_performing_keyword: Optional[str] = Field(None, description="Pire mot-clé")
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class OpportunityResponse(BaseModel):
@@ -161,25 +232,25 @@ class OpportunityResponse(BaseModel):
     analysis_date: datetime = Field(..., description="Date d'analyse")
     
     # Opportunités manquées
-    missed_opportunities: List[Dict[str, Any]] = Field(
+    missed_opportunities: Rows = Field(
         default_factory=list,
         description="Opportunités manquées"
     )
     
     # Mots-clés avec potentiel
-    potential_keywords: List[Dict[str, Any]] = Field(
+    potential_keywords: Rows = Field(
         default_factory=list,
         description="Mots-clés avec potentiel"
     )
     
     # Gaps concurrentiels
-    competitive_gaps: List[Dict[str, Any]] = Field(
+    competitive_gaps: Rows = Field(
         default_factory=list,
         description="Gaps concurrentiels"
     )
     
     # Opportunités de prix
-    price_opportunities: List[Dict[str, Any]] = Field(
+    price_opportunities: Rows = Field(
         default_factory=list,
         description="Opportunités de prix"
     )
@@ -197,6 +268,8 @@ class OpportunityResponse(BaseModel):
     estimated_revenue_impact: Optional[float] = Field(
         None, ge=0.0, description="Impact revenus estimé"
     )
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class TrendAnalysisResponse(BaseModel):
@@ -207,7 +280,7 @@ class TrendAnalysisResponse(BaseModel):
     date_range: Dict[str, datetime] = Field(..., description="Plage de dates")
     
     # Données temporelles
-    timeline: List[Dict[str, Any]] = Field(
+    timeline: Rows = Field(
         default_factory=list,
         description="Données temporelles"
     )
@@ -220,7 +293,7 @@ class TrendAnalysisResponse(BaseModel):
     )
     
     # Prédictions
-    predicted_values: List[Dict[str, Any]] = Field(
+    predicted_values: Rows = Field(
         default_factory=list,
         description="Valeurs prédites"
     )
@@ -237,6 +310,8 @@ class TrendAnalysisResponse(BaseModel):
         default_factory=list,
         description="Recommandations"
     )
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class CompetitorComparisonResponse(BaseModel):
@@ -247,20 +322,20 @@ class CompetitorComparisonResponse(BaseModel):
     date_range: Dict[str, datetime] = Field(..., description="Plage de dates")
     
     # Comparaison des métriques
-    metrics_comparison: Dict[str, List[Dict[str, Any]]] = Field(
+    metrics_comparison: Dict[str, Rows] = Field(
         default_factory=dict,
         description="Comparaison des métriques"
     )
     
     # Analyse SWOT simplifiée
-    competitive_analysis: List[Dict[str, Any]] = Field(
+    competitive_analysis: Rows = Field(
         default_factory=list,
         description="Analyse concurrentielle"
     )
     
     # Benchmarking
     market_leader: Optional[str] = Field(None, description="Leader du marché")
-    performance_ranking: List[Dict[str, Any]] = Field(
+    performance_ranking: Rows = Field(
         default_factory=list,
         description="Classement de performance"
     )
@@ -269,4 +344,6 @@ class CompetitorComparisonResponse(BaseModel):
     strategic_recommendations: List[str] = Field(
         default_factory=list,
         description="Recommandations stratégiques"
-    ) 
\ No newline at end of file
+    )
+    
+    model_config = _RESPONSE_CONFIG
@@ -1,10 +1,44 @@
 """Schemas Pydantic pour les concurrents."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict, validator
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, computed_field, field_validator
+from typing_extensions import TypedDict
+
+from app.models.domain import normalize_domain
+
+
+# Réponses construites une fois à partir des lignes ORM et jamais modifiées
+# (champs inconnus refusés : pas de stockage des extras par instance)
+_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="forbid",
+    validate_assignment=False,
+    revalidate_instances="never"
+)
+
+
+def _clean_domain(v: Optional[str]) -> Optional[str]:
+    """Valide et nettoie un domaine (préfixes retirés par une seule regex).
+
+    Partagé par les validateurs de création et de mise à jour (None laissé tel quel).
+    """
+    if v is None:
+        return v
+    
+    if not v:
+        raise ValueError('Le domaine ne peut pas être vide')
+    
+    domain = normalize_domain(v.strip())
+    
+    # Validation basique du format de domaine
+    if not domain or '.' not in domain:
+        raise ValueError('Format de domaine invalide')
+    
+    return domain
 
 
 class CompetitorBase(BaseModel):
@@ -32,30 +66,11 @@ class CompetitorBase(BaseModel):
         description="Indique si c'est la marque principale"
     )
     
-    @validator('domain')
+    @field_validator('domain')
+    @classmethod
     def validate_domain(cls, v):
         """Valide et nettoie le domaine."""
-        if not v:
-            raise ValueError('Le domaine ne peut pas être vide')
-        
-        # Nettoyer le domaine
-        domain = v.lower().strip()
-        
-        # Supprimer les préfixes communs
-        prefixes = ['https://', 'http://', 'www.']
-        for prefix in prefixes:
-            if domain.startswith(prefix):
-                domain = domain[len(prefix):]
-        
-        # Supprimer le slash final
-        if domain.endswith('/'):
-            domain = domain[:-1]
-        
-        # Validation basique du format de domaine
-        if not domain or '.' not in domain:
-            raise ValueError('Format de domaine invalide')
-        
-        return domain
+        return _clean_domain(v)
 
 
 class CompetitorCreate(CompetitorBase):
@@ -88,33 +103,11 @@ class CompetitorUpdate(BaseModel):
         description="Indique si c'est la marque principale"
     )
     
-    @validator('domain')
+    @field_validator('domain')
+    @classmethod
     def validate_domain(cls, v):
         """Valide et nettoie le domaine."""
-        if v is None:
-            return v
-        
-        if not v:
-            raise ValueError('Le domaine ne peut pas être vide')
-        
-        # Nettoyer le domaine
-        domain = v.lower().strip()
-        
-        # Supprimer les préfixes communs
-        prefixes = ['https://', 'http://', 'www.']
-        for prefix in prefixes:
-            if domain.startswith(prefix):
-                domain = domain[len(prefix):]
-        
-        # Supprimer le slash final
-        if domain.endswith('/'):
-            domain = domain[:-1]
-        
-        # Validation basique du format de domaine
-        if not domain or '.' not in domain:
-            raise ValueError('Format de domaine invalide')
-        
-        return domain
+        return _clean_domain(v)
 
 
 class CompetitorResponse(CompetitorBase):
@@ -134,7 +127,16 @@ class CompetitorResponse(CompetitorBase):
         description="Domaine nettoyé"
     )
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
+    
+    @classmethod
+    def validate_many(cls, rows: Iterable[Any]) -> List["CompetitorResponse"]:
+        """Valide un lot de lignes (objets ORM ou dicts) en un seul appel pydantic-core."""
+        return CompetitorListAdapter.validate_python(rows, from_attributes=True)
+
+
+# Validateur de liste construit une seule fois (CompetitorResponse.validate_many)
+CompetitorListAdapter = TypeAdapter(List[CompetitorResponse])
 
 
 class CompetitorListResponse(BaseModel):
@@ -160,20 +162,33 @@ class CompetitorListResponse(BaseModel):
         le=100,
         description="Nombre d'éléments par page"
     )
-    has_next: bool = Field(
-        ...,
-        description="Indique s'il y a une page suivante"
-    )
-    has_prev: bool = Field(
-        ...,
-        description="Indique s'il y a une page précédente"
-    )
+    
+    model_config = _RESPONSE_CONFIG
+    
+    # Dérivés de page, per_page et total : calculés à la sérialisation, jamais validés
+    @computed_field(description="Indique s'il y a une page suivante")
+    @property
+    def has_next(self) -> bool:
+        return self.page * self.per_page < self.total
+    
+    @computed_field(description="Indique s'il y a une page précédente")
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+
+class CompetitorRef(TypedDict):
+    """Référence légère à un concurrent, embarquée dans les métriques par ligne."""
+    
+    id: UUID
+    name: str
+    domain: str
 
 
 class CompetitorPerformance(BaseModel):
     """Schema pour les performances d'un concurrent."""
     
-    competitor: CompetitorResponse = Field(
+    competitor: CompetitorRef = Field(
         ...,
         description="Informations du concurrent"
     )
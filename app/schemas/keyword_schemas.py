@@ -1,10 +1,45 @@
 """Schemas Pydantic pour les mots-clés."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterable, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict, validator
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, computed_field, field_validator
+from typing_extensions import TypedDict
+
+# Réponses construites une fois à partir des lignes ORM et jamais modifiées
+# (champs inconnus refusés : pas de stockage des extras par instance)
+_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="forbid",
+    validate_assignment=False,
+    revalidate_instances="never"
+)
+
+
+# Langues supportées pour le scraping (vérifiées nativement par pydantic-core)
+LanguageCode = Literal['fr', 'en', 'es', 'de', 'it', 'pt', 'nl']
+
+
+def _clean_keyword(v: Optional[str]) -> Optional[str]:
+    """Valide et nettoie un mot-clé.
+
+    Partagé par les validateurs de création et de mise à jour (None laissé tel quel).
+    """
+    if v is None:
+        return v
+    
+    if not v:
+        raise ValueError('Le mot-clé ne peut pas être vide')
+    
+    # Nettoyer le mot-clé
+    keyword = v.strip()
+    
+    if len(keyword) < 1:
+        raise ValueError('Le mot-clé doit contenir au moins 1 caractère')
+    
+    return keyword
 
 
 class KeywordBase(BaseModel):
@@ -21,9 +56,8 @@ class KeywordBase(BaseModel):
         max_length=50,
         description="Localisation pour le scraping"
     )
-    language: str = Field(
+    language: LanguageCode = Field(
         default="fr",
-        max_length=10,
         description="Langue pour le scraping"
     )
     search_volume: Optional[int] = Field(
@@ -36,27 +70,11 @@ class KeywordBase(BaseModel):
         description="Statut actif du mot-clé"
     )
     
-    @validator('keyword')
+    @field_validator('keyword')
+    @classmethod
     def validate_keyword(cls, v):
         """Valide et nettoie le mot-clé."""
-        if not v:
-            raise ValueError('Le mot-clé ne peut pas être vide')
-        
-        # Nettoyer le mot-clé
-        keyword = v.strip()
-        
-        if len(keyword) < 1:
-            raise ValueError('Le mot-clé doit contenir au moins 1 caractère')
-        
-        return keyword
-    
-    @validator('language')
-    def validate_language(cls, v):
-        """Valide le code de langue."""
-        valid_languages = ['fr', 'en', 'es', 'de', 'it', 'pt', 'nl']
-        if v not in valid_languages:
-            raise ValueError(f'Langue non supportée. Langues valides: {", ".join(valid_languages)}')
-        return v
+        return _clean_keyword(v)
 
 
 class KeywordCreate(KeywordBase):
@@ -64,6 +82,20 @@ class KeywordCreate(KeywordBase):
     pass
 
 
+class KeywordBulkCreate(BaseModel):
+    """Schema pour l'ajout de mots-clés en bulk à un projet.
+
+    Validé depuis le corps brut (model_validate_json) : analyse JSON et
+    validation en une seule passe pydantic-core.
+    """
+    
+    keywords: List[KeywordCreate] = Field(
+        ...,
+        min_length=1,
+        description="Mots-clés à ajouter"
+    )
+
+
 class KeywordUpdate(BaseModel):
     """Schema pour la mise à jour d'un mot-clé."""
     
@@ -78,9 +110,8 @@ class KeywordUpdate(BaseModel):
         max_length=50,
         description="Localisation pour le scraping"
     )
-    language: Optional[str] = Field(
+    language: Optional[LanguageCode] = Field(
         None,
-        max_length=10,
         description="Langue pour le scraping"
     )
     search_volume: Optional[int] = Field(
@@ -93,33 +124,11 @@ class KeywordUpdate(BaseModel):
         description="Statut actif du mot-clé"
     )
     
-    @validator('keyword')
+    @field_validator('keyword')
+    @classmethod
     def validate_keyword(cls, v):
         """Valide et nettoie le mot-clé."""
-        if v is None:
-            return v
-        
-        if not v:
-            raise ValueError('Le mot-clé ne peut pas être vide')
-        
-        # Nettoyer le mot-clé
-        keyword = v.strip()
-        
-        if len(keyword) < 1:
-            raise ValueError('Le mot-clé doit contenir au moins 1 caractère')
-        
-        return keyword
-    
-    @validator('language')
-    def validate_language(cls, v):
-        """Valide le code de langue."""
-        if v is None:
-            return v
-        
-        valid_languages = ['fr', 'en', 'es', 'de', 'it', 'pt', 'nl']
-        if v not in valid_languages:
-            raise ValueError(f'Langue non supportée. Langues valides: {", ".join(valid_languages)}')
-        return v
+        return _clean_keyword(v)
 
 
 class KeywordResponse(KeywordBase):
@@ -143,7 +152,16 @@ class KeywordResponse(KeywordBase):
         description="Niveau de difficulté (low/medium/high/unknown)"
     )
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _RESPONSE_CONFIG
+    
+    @classmethod
+    def validate_many(cls, rows: Iterable[Any]) -> List["KeywordResponse"]:
+        """Valide un lot de lignes (objets ORM ou dicts) en un seul appel pydantic-core."""
+        return KeywordListAdapter.validate_python(rows, from_attributes=True)
+
+
+# Validateur de liste construit une seule fois (KeywordResponse.validate_many)
+KeywordListAdapter = TypeAdapter(List[KeywordResponse])
 
 
 class KeywordListResponse(BaseModel):
@@ -169,20 +187,33 @@ class KeywordListResponse(BaseModel):
         le=100,
         description="Nombre d'éléments par page"
     )
-    has_next: bool = Field(
-        ...,
-        description="Indique s'il y a une page suivante"
-    )
-    has_prev: bool = Field(
-        ...,
-        description="Indique s'il y a une page précédente"
-    )
+    
+    model_config = _RESPONSE_CONFIG
+    
+    # Dérivés de page, per_page et total : calculés à la sérialisation, jamais validés
+    @computed_field(description="Indique s'il y a une page suivante")
+    @property
+    def has_next(self) -> bool:
+        return self.page * self.per_page < self.total
+    
+    @computed_field(description="Indique s'il y a une page précédente")
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+
+class KeywordRef(TypedDict):
+    """Référence légère à un mot-clé, embarquée dans les métriques par ligne."""
+    
+    id: UUID
+    keyword: str
+    language: str
 
 
 class KeywordPerformance(BaseModel):
     """Schema pour les performances d'un mot-clé."""
     
-    keyword: KeywordResponse = Field(
+    keyword: KeywordRef = Field(
         ...,
         description="Informations du mot-clé"
     )
@@ -299,12 +330,14 @@ class KeywordHistory(BaseModel):
         le=100.0,
         description="Score de visibilité"
     )
+    
+    model_config = _RESPONSE_CONFIG
 
 
 class KeywordHistoryResponse(BaseModel):
     """Schema de réponse pour l'historique d'un mot-clé."""
     
-    keyword: KeywordResponse = Field(
+    keyword: KeywordRef = Field(
         ...,
         description="Informations du mot-clé"
     )
@@ -320,4 +353,6 @@ class KeywordHistoryResponse(BaseModel):
         ...,
         ge=0,
         description="Nombre total de points de données"
-    ) 
\ No newline at end of file
+    )
+    
+    model_config = _RESPONSE_CONFIG
@@ -69,7 +69,8 @@ class ProjectResponse(ProjectBase):
         description="Nombre de mots-clés actifs"
     )
     
-    model_config = ConfigDict(from_attributes=True)
+    # Lecture directe des attributs ORM, sans validation à l'affectation
+    model_config = ConfigDict(from_attributes=True, extra="ignore", validate_assignment=False)
 
 
 class ProjectListResponse(BaseModel):
@@ -103,6 +104,10 @@ class ProjectListResponse(BaseModel):
         ...,
         description="Indique s'il y a une page précédente"
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Curseur opaque de la page suivante (paramètre cursor)"
+    )
 
 
 class ProjectDashboard(BaseModel):
@@ -1,11 +1,16 @@
 """Service pour les analytics et métriques du projet."""
 
+import asyncio
 import structlog
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc, distinct
-from fastapi import HTTPException
+from sqlalchemy import JSON, select, func, and_, desc, distinct, bindparam
+from fastapi import Depends, HTTPException
+
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_session
+from app.services.position_matrix import compute_position_matrix
 
 from app.models.project import Project
 from app.models.competitor import Competitor
@@ -14,7 +19,9 @@ from app.models.serp_result import SerpResult
 from app.schemas.analytics import (
     DashboardResponse,
     DashboardMetrics,
+    ShareOfVoiceItem,
     ShareOfVoiceResponse,
+    PositionMatrixItem,
     PositionMatrixResponse,
     OpportunitiesResponse,
     CompetitorComparison,
@@ -25,317 +32,513 @@ from app.schemas.analytics import (
 
 logger = structlog.get_logger()
 
+# Dashboards construits en parallèle par le lot (une connexion du pool chacun)
+BATCH_DASHBOARD_CONCURRENCY = 4
+
+
+# Requêtes construites une seule fois à l'import : seules les valeurs des
+# paramètres liés changent d'une requête HTTP à l'autre.
+# Lectures seules : on sélectionne des colonnes (lignes Core) plutôt que des entités ORM
+PROJECT_BY_ID_STMT = select(
+    Project.id,
+    Project.name,
+    Project.reference_site
+).where(Project.id == bindparam("project_id"))
+KEYWORDS_BY_PROJECT_STMT = select(
+    Keyword.id,
+    Keyword.keyword,
+    Keyword.search_volume
+).where(Keyword.project_id == bindparam("project_id"))
+
+# Version des données d'un projet (paramètre : project_id), utilisée pour les ETags
+DATA_VERSION_STMT = select(
+    select(func.max(SerpResult.scraped_at))
+    .where(SerpResult.project_id == bindparam("project_id")).scalar_subquery(),
+    select(func.count(Keyword.id))
+    .where(Keyword.project_id == bindparam("project_id")).scalar_subquery(),
+    select(func.count(Competitor.id))
+    .where(Competitor.project_id == bindparam("project_id")).scalar_subquery(),
+    select(Project.updated_at)
+    .where(Project.id == bindparam("project_id")).scalar_subquery()
+)
+
+# Agrégats du dashboard (paramètres : project_id, since)
+DASHBOARD_KEYWORDS_STMT = select(func.count(Keyword.id)).where(
+    and_(Keyword.project_id == bindparam("project_id"), Keyword.is_active == True)
+)
+DASHBOARD_COMPETITORS_STMT = select(func.count(Competitor.id)).where(
+    Competitor.project_id == bindparam("project_id")
+)
+DASHBOARD_AVG_POSITION_STMT = select(func.avg(SerpResult.position)).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.position.isnot(None),
+        SerpResult.scraped_at >= bindparam("since")
+    )
+)
+DASHBOARD_APPEARANCES_STMT = select(func.count(SerpResult.id)).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.scraped_at >= bindparam("since")
+    )
+)
+DASHBOARD_VISIBILITY_STMT = select(
+    func.avg(SerpResult.position),
+    func.count(SerpResult.id)
+).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.scraped_at >= bindparam("since")
+    )
+)
+DASHBOARD_OPPORTUNITIES_STMT = select(func.count(SerpResult.id)).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.position.between(11, 20),
+        SerpResult.scraped_at >= bindparam("since")
+    )
+)
+DASHBOARD_LAST_SCRAPE_STMT = select(func.max(SerpResult.scraped_at)).where(
+    SerpResult.project_id == bindparam("project_id")
+)
+
+# Agrégats du dashboard pour plusieurs projets (paramètres : project_ids, since)
+BATCH_PROJECTS_STMT = select(
+    Project.id, Project.name, Project.reference_site
+).where(Project.id.in_(bindparam("project_ids", expanding=True)))
+BATCH_KEYWORDS_STMT = select(
+    Keyword.project_id, func.count(Keyword.id)
+).where(
+    and_(
+        Keyword.project_id.in_(bindparam("project_ids", expanding=True)),
+        Keyword.is_active == True
+    )
+).group_by(Keyword.project_id)
+BATCH_COMPETITORS_STMT = select(
+    Competitor.project_id, func.count(Competitor.id)
+).where(
+    Competitor.project_id.in_(bindparam("project_ids", expanding=True))
+).group_by(Competitor.project_id)
+_recent_serp = SerpResult.scraped_at >= bindparam("since")
+BATCH_SERP_STMT = select(
+    SerpResult.project_id,
+    func.avg(SerpResult.position).filter(_recent_serp),
+    func.count(SerpResult.id).filter(_recent_serp),
+    func.count(SerpResult.id).filter(and_(_recent_serp, SerpResult.position.between(11, 20))),
+    func.max(SerpResult.scraped_at)
+).where(
+    SerpResult.project_id.in_(bindparam("project_ids", expanding=True))
+).group_by(SerpResult.project_id)
+
+# Share of Voice (paramètres : project_id, period_start, period_end)
+SOV_TOTAL_APPEARANCES_STMT = select(func.count(SerpResult.id)).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.scraped_at.between(bindparam("period_start"), bindparam("period_end"))
+    )
+)
+SOV_BY_DOMAIN_STMT = select(
+    SerpResult.domain,
+    SerpResult.merchant_name,
+    func.count(SerpResult.id).label('appearances'),
+    func.avg(SerpResult.position).label('avg_position')
+).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.scraped_at.between(bindparam("period_start"), bindparam("period_end")),
+        SerpResult.domain.isnot(None)
+    )
+).group_by(
+    SerpResult.domain, SerpResult.merchant_name
+).order_by(
+    desc('appearances')
+)
+
+# Positions par mot-clé (paramètres : keyword_id, domain), exécutées pour chaque mot-clé
+KEYWORD_LAST_POSITIONS_STMT = select(
+    SerpResult.position,
+    SerpResult.url,
+    SerpResult.scraped_at
+).where(
+    and_(
+        SerpResult.keyword_id == bindparam("keyword_id"),
+        SerpResult.domain == bindparam("domain"),
+        SerpResult.position.isnot(None)
+    )
+).order_by(desc(SerpResult.scraped_at)).limit(2)
+KEYWORD_URLS_COUNT_STMT = select(func.count(func.distinct(SerpResult.url))).where(
+    and_(
+        SerpResult.keyword_id == bindparam("keyword_id"),
+        SerpResult.domain == bindparam("domain"),
+        SerpResult.url.isnot(None)
+    )
+)
+
+# Matrice de positions (paramètres : project_id, period_start, period_end)
+# Meilleure position par (mot-clé, domaine) sur la période, lue sur l'index
+# couvrant (project_id, scraped_at, domain, position, ...)
+_BEST_POSITIONS = select(
+    SerpResult.keyword_id,
+    SerpResult.domain,
+    func.min(SerpResult.position).label("best_position")
+).where(
+    and_(
+        SerpResult.project_id == bindparam("project_id"),
+        SerpResult.scraped_at >= bindparam("period_start"),
+        SerpResult.scraped_at <= bindparam("period_end"),
+        SerpResult.position.isnot(None),
+        SerpResult.domain.isnot(None)
+    )
+).group_by(
+    SerpResult.keyword_id, SerpResult.domain
+).subquery()
+
+# Agrégat JSON objet du dialecte configuré (json_group_object sous SQLite)
+_json_object_agg = (
+    func.json_group_object if settings.database_url.startswith("sqlite")
+    else func.json_object_agg
+)
+
+# Une ligne par mot-clé actif, pivot domaine -> meilleure position construit par la base
+POSITION_MATRIX_STMT = select(
+    Keyword.id,
+    Keyword.keyword,
+    Keyword.search_volume,
+    _json_object_agg(
+        _BEST_POSITIONS.c.domain, _BEST_POSITIONS.c.best_position, type_=JSON
+    )
+).join(
+    _BEST_POSITIONS, Keyword.id == _BEST_POSITIONS.c.keyword_id
+).where(
+    and_(
+        Keyword.project_id == bindparam("project_id"),
+        Keyword.is_active == True
+    )
+).group_by(
+    Keyword.id, Keyword.keyword, Keyword.search_volume
+)
+
+
+def build_dashboard_metrics(
+    total_keywords: int,
+    total_competitors: int,
+    average_position: Optional[float],
+    total_appearances: int,
+    visibility_data,
+    total_opportunities: int,
+    last_scrape_date: Optional[datetime]
+) -> DashboardMetrics:
+    """Construire les métriques du dashboard à partir des agrégats SQL."""
+    if average_position:
+        average_position = float(average_position)
+    else:
+        average_position = None
+    
+    # Pour le moment, on ne peut pas calculer le Share of Voice du site principal
+    # car on n'a pas de champ reference_site dans le projet
+    share_of_voice = 0.0
+    
+    # Score de visibilité basé sur (position moyenne, nombre d'apparitions)
+    visibility_score = 0.0
+    if visibility_data and visibility_data[0] and visibility_data[1]:
+        avg_pos = float(visibility_data[0])
+        appearances = visibility_data[1]
+        # Score basé sur la position (plus la position est bonne, plus le score est élevé)
+        if avg_pos > 0:
+            position_score = max(0, 100 - (avg_pos * 5))  # Position 1 = 95pts, Position 10 = 50pts
+            visibility_score = min(100, position_score * (appearances / max(total_keywords, 1)))
+    
+    return DashboardMetrics(
+        total_keywords=total_keywords,
+        total_competitors=total_competitors,
+        average_position=average_position,
+        share_of_voice=share_of_voice,
+        total_opportunities=total_opportunities,
+        visibility_score=visibility_score,
+        last_scrape_date=last_scrape_date or datetime.utcnow()
+    )
+
+
 class AnalyticsService:
     """Service pour les analytics et métriques."""
     
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def get_dashboard_metrics(self, project_id: str) -> DashboardResponse:
-        """Récupérer les métriques du dashboard avec de vraies données."""
-        logger.info("Récupération métriques dashboard", project_id=project_id)
+    async def _fetch_rows_concurrently(self, queries, params: Dict[str, Any]) -> List[Any]:
+        """Exécute des requêtes indépendantes en parallèle et retourne leur première ligne.
         
-        try:
-            # Récupérer le projet
-            project_query = select(Project).where(Project.id == project_id)
-            project_result = await self.session.execute(project_query)
-            project = project_result.scalar_one_or_none()
-            
-            if not project:
-                raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
-            
-            # 1. Compter les mots-clés réels
-            keywords_query = select(func.count(Keyword.id)).where(
-                and_(Keyword.project_id == project_id, Keyword.is_active == True)
-            )
-            keywords_result = await self.session.execute(keywords_query)
-            total_keywords = keywords_result.scalar() or 0
-            
-            # 2. Compter les concurrents réels
-            competitors_query = select(func.count(Competitor.id)).where(
-                Competitor.project_id == project_id
-            )
-            competitors_result = await self.session.execute(competitors_query)
-            total_competitors = competitors_result.scalar() or 0
-            
-            # 3. Calculer la position moyenne réelle
-            avg_position_query = select(func.avg(SerpResult.position)).where(
-                and_(
-                    SerpResult.project_id == project_id,
-                    SerpResult.position.isnot(None),
-                    SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)  # Dernière semaine
-                )
-            )
-            avg_position_result = await self.session.execute(avg_position_query)
-            average_position = avg_position_result.scalar()
-            if average_position:
-                average_position = float(average_position)
-            else:
-                average_position = None
-            
-            # 4. Calculer le Share of Voice réel
-            # Total des apparitions dans les résultats récents
-            total_appearances_query = select(func.count(SerpResult.id)).where(
+        Une AsyncSession ne supporte pas les accès concurrents : chaque requête
+        utilise donc sa propre session.
+        """
+        async def fetch_row(query):
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query, params)
+                return result.fetchone()
+        
+        return await asyncio.gather(*(fetch_row(query) for query in queries))
+    
+    async def get_data_version(self, project_id: str) -> str:
+        """Version courte des données d'un projet (dernier scraping, mots-clés, concurrents)."""
+        result = await self.session.execute(DATA_VERSION_STMT, {"project_id": project_id})
+        return "|".join(str(value) for value in result.one())
+    
+    async def _build_dashboard(
+        self, project, metrics: DashboardMetrics, total_appearances: int
+    ) -> DashboardResponse:
+        """Compléter les métriques avec les tops mots-clés, concurrents et changements récents."""
+        project_id = project.id
+        
+        # 8. Top mots-clés réels pour VOTRE site uniquement (meilleures positions récentes, groupés par mot-clé)
+        top_keywords_query = select(
+            Keyword.keyword,
+            func.min(SerpResult.position).label('best_position'),
+            Keyword.search_volume,
+            func.max(SerpResult.scraped_at).label('latest_scrape')
+        ).select_from(
+            Keyword.__table__.join(
+                SerpResult.__table__,
                 and_(
-                    SerpResult.project_id == project_id,
+                    Keyword.id == SerpResult.keyword_id,
+                    Keyword.project_id == project_id,
                     SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)
                 )
             )
-            total_appearances_result = await self.session.execute(total_appearances_query)
-            total_appearances = total_appearances_result.scalar() or 0
-            
-            # Pour le moment, on ne peut pas calculer le Share of Voice du site principal
-            # car on n'a pas de champ reference_site dans le projet
-            share_of_voice = 0.0
-            
-            # 5. Calculer le score de visibilité (basé sur positions moyennes)
-            visibility_query = select(
-                func.avg(SerpResult.position),
-                func.count(SerpResult.id)
-            ).where(
-                and_(
-                    SerpResult.project_id == project_id,
-                    SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)
-                )
+        ).where(
+            and_(
+                SerpResult.position.isnot(None),
+                SerpResult.domain.like(f"%{project.reference_site}%") if project.reference_site else False
             )
-            visibility_result = await self.session.execute(visibility_query)
-            visibility_data = visibility_result.fetchone()
-            
-            visibility_score = 0.0
-            if visibility_data and visibility_data[0] and visibility_data[1]:
-                avg_pos = float(visibility_data[0])
-                appearances = visibility_data[1]
-                # Score basé sur la position (plus la position est bonne, plus le score est élevé)
-                if avg_pos > 0:
-                    position_score = max(0, 100 - (avg_pos * 5))  # Position 1 = 95pts, Position 10 = 50pts
-                    visibility_score = min(100, position_score * (appearances / max(total_keywords, 1)))
-            
-            # 6. Calculer les opportunités (positions 11-20 = opportunités d'amélioration)  
-            opportunities_query = select(func.count(SerpResult.id)).where(
+        ).group_by(
+            Keyword.keyword, Keyword.search_volume
+        ).order_by(
+            Keyword.search_volume.desc(),  # Classé par volume décroissant
+            func.min(SerpResult.position).asc()  # Puis par meilleure position
+        ).limit(5)
+        
+        top_keywords_result = await self.session.execute(top_keywords_query)
+        top_keywords_data = top_keywords_result.fetchall()
+        
+        top_keywords = []
+        for row in top_keywords_data:
+            top_keywords.append({
+                "keyword": row[0],
+                "position": int(row[1]) if row[1] else None,
+                "volume": row[2] or 1000,  # Volume par défaut si pas défini
+                "trend": "stable"  # TODO: calculer la vraie tendance
+            })
+        
+        # Si pas assez de données réelles pour votre site, indiquer qu'il n'y en a pas
+        if len(top_keywords) == 0:
+            top_keywords.append({
+                "keyword": "Aucune position trouvée",
+                "position": None,
+                "volume": 0,
+                "trend": "stable",
+                "note": f"Aucune position trouvée pour {project.reference_site or 'votre site'} dans les résultats shopping"
+            })
+        
+        # Si pas assez de données réelles, compléter avec des exemples
+        if len(top_keywords) < 3:
+            demo_keywords = [
+                {"keyword": "smartphone pas cher", "position": 8, "volume": 12000, "trend": "up"},
+                {"keyword": "iPhone 15 Pro", "position": 12, "volume": 8500, "trend": "stable"},
+                {"keyword": "casque bluetooth", "position": 6, "volume": 15000, "trend": "down"}
+            ]
+            # Ajouter seulement les mots-clés de démo nécessaires
+            needed_count = min(3 - len(top_keywords), len(demo_keywords))
+            top_keywords.extend(demo_keywords[:needed_count])
+        
+        # 9. Top concurrents réels
+        top_competitors_query = select(
+            Competitor.name,
+            Competitor.domain,
+            func.avg(SerpResult.position).label('avg_position'),
+            func.count(SerpResult.id).label('appearances')
+        ).select_from(
+            Competitor.__table__.join(
+                SerpResult.__table__,
                 and_(
-                    SerpResult.project_id == project_id,
-                    SerpResult.position.between(11, 20),
+                    Competitor.id == SerpResult.competitor_id,
+                    Competitor.project_id == project_id,
                     SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)
                 )
             )
-            opportunities_result = await self.session.execute(opportunities_query)
-            total_opportunities = opportunities_result.scalar() or 0
-            
-            # 7. Date du dernier scraping
-            last_scrape_query = select(func.max(SerpResult.scraped_at)).where(
-                SerpResult.project_id == project_id
-            )
-            last_scrape_result = await self.session.execute(last_scrape_query)
-            last_scrape_date = last_scrape_result.scalar() or datetime.utcnow()
-            
-            # Créer les métriques avec de vraies données
-            metrics = DashboardMetrics(
-                total_keywords=total_keywords,
-                total_competitors=total_competitors,
-                average_position=average_position,
-                share_of_voice=share_of_voice,
-                total_opportunities=total_opportunities,
-                visibility_score=visibility_score,
-                last_scrape_date=last_scrape_date
-            )
-            
-            # 8. Top mots-clés réels pour VOTRE site uniquement (meilleures positions récentes, groupés par mot-clé)
-            top_keywords_query = select(
-                Keyword.keyword,
-                func.min(SerpResult.position).label('best_position'),
-                Keyword.search_volume,
-                func.max(SerpResult.scraped_at).label('latest_scrape')
-            ).select_from(
-                Keyword.__table__.join(
-                    SerpResult.__table__,
-                    and_(
-                        Keyword.id == SerpResult.keyword_id,
-                        Keyword.project_id == project_id,
-                        SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)
-                    )
-                )
-            ).where(
+        ).group_by(
+            Competitor.name, Competitor.domain
+        ).order_by(
+            desc('appearances')
+        ).limit(5)
+        
+        top_competitors_result = await self.session.execute(top_competitors_query)
+        top_competitors_data = top_competitors_result.fetchall()
+        
+        top_competitors = []
+        for row in top_competitors_data:
+            appearances = row[3]
+            competitor_share = (appearances / max(total_appearances, 1)) * 100 if total_appearances > 0 else 0
+            
+            top_competitors.append({
+                "name": row[0],
+                "domain": row[1],
+                "share_of_voice": competitor_share,
+                "avg_position": float(row[2]) if row[2] else None,
+                "trend": "stable"  # TODO: calculer la vraie tendance
+            })
+        
+        # Si pas assez de concurrents réels, compléter avec des exemples
+        if len(top_competitors) < 3:
+            demo_competitors = [
+                {"name": "Amazon", "domain": "amazon.fr", "share_of_voice": 24.5, "avg_position": 3.2, "trend": "up"},
+                {"name": "Fnac", "domain": "fnac.com", "share_of_voice": 18.7, "avg_position": 5.8, "trend": "stable"},
+                {"name": "Cdiscount", "domain": "cdiscount.com", "share_of_voice": 15.3, "avg_position": 7.1, "trend": "down"}
+            ]
+            top_competitors.extend(demo_competitors[len(top_competitors):])
+        
+        # 10. Changements récents réels pour VOTRE site uniquement (détection de vrais changements de position)
+        # Chercher les changements de position dans les dernières 48h pour votre site
+        position_changes_query = select(
+            Keyword.keyword,
+            SerpResult.position,
+            SerpResult.scraped_at,
+            SerpResult.domain
+        ).select_from(
+            Keyword.__table__.join(
+                SerpResult.__table__,
                 and_(
-                    SerpResult.position.isnot(None),
+                    Keyword.id == SerpResult.keyword_id,
+                    Keyword.project_id == project_id,
+                    SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=2),  # 2 jours pour comparer
                     SerpResult.domain.like(f"%{project.reference_site}%") if project.reference_site else False
                 )
-            ).group_by(
-                Keyword.keyword, Keyword.search_volume
-            ).order_by(
-                Keyword.search_volume.desc(),  # Classé par volume décroissant
-                func.min(SerpResult.position).asc()  # Puis par meilleure position
-            ).limit(5)
-            
-            top_keywords_result = await self.session.execute(top_keywords_query)
-            top_keywords_data = top_keywords_result.fetchall()
-            
-            top_keywords = []
-            for row in top_keywords_data:
-                top_keywords.append({
-                    "keyword": row[0],
-                    "position": int(row[1]) if row[1] else None,
-                    "volume": row[2] or 1000,  # Volume par défaut si pas défini
-                    "trend": "stable"  # TODO: calculer la vraie tendance
-                })
-            
-            # Si pas assez de données réelles pour votre site, indiquer qu'il n'y en a pas
-            if len(top_keywords) == 0:
-                top_keywords.append({
-                    "keyword": "Aucune position trouvée",
-                    "position": None,
-                    "volume": 0,
-                    "trend": "stable",
-                    "note": f"Aucune position trouvée pour {project.reference_site or 'votre site'} dans les résultats shopping"
-                })
-            
-            # Si pas assez de données réelles, compléter avec des exemples
-            if len(top_keywords) < 3:
-                demo_keywords = [
-                    {"keyword": "smartphone pas cher", "position": 8, "volume": 12000, "trend": "up"},
-                    {"keyword": "iPhone 15 Pro", "position": 12, "volume": 8500, "trend": "stable"},
-                    {"keyword": "casque bluetooth", "position": 6, "volume": 15000, "trend": "down"}
-                ]
-                # Ajouter seulement les mots-clés de démo nécessaires
-                needed_count = min(3 - len(top_keywords), len(demo_keywords))
-                top_keywords.extend(demo_keywords[:needed_count])
-            
-            # 9. Top concurrents réels
-            top_competitors_query = select(
-                Competitor.name,
-                Competitor.domain,
-                func.avg(SerpResult.position).label('avg_position'),
-                func.count(SerpResult.id).label('appearances')
-            ).select_from(
-                Competitor.__table__.join(
-                    SerpResult.__table__,
-                    and_(
-                        Competitor.id == SerpResult.competitor_id,
-                        Competitor.project_id == project_id,
-                        SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=7)
-                    )
-                )
-            ).group_by(
-                Competitor.name, Competitor.domain
-            ).order_by(
-                desc('appearances')
-            ).limit(5)
-            
-            top_competitors_result = await self.session.execute(top_competitors_query)
-            top_competitors_data = top_competitors_result.fetchall()
-            
-            top_competitors = []
-            for row in top_competitors_data:
-                appearances = row[3]
-                competitor_share = (appearances / max(total_appearances, 1)) * 100 if total_appearances > 0 else 0
+            )
+        ).order_by(
+            Keyword.keyword,
+            desc(SerpResult.scraped_at)
+        ).limit(50)  # Augmenter pour avoir plus de données à analyser
+        
+        position_changes_result = await self.session.execute(position_changes_query)
+        position_changes_data = position_changes_result.fetchall()
+        
+        recent_changes = []
+        
+        # Analyser les changements par mot-clé pour votre site
+        keyword_positions = {}
+        for row in position_changes_data:
+            keyword = row[0]
+            position = row[1]
+            scraped_at = row[2]
+            domain = row[3]
+            
+            if keyword not in keyword_positions:
+                keyword_positions[keyword] = []
+            keyword_positions[keyword].append({
+                'position': position,
+                'scraped_at': scraped_at,
+                'domain': domain
+            })
+        
+        # Détecter les changements significatifs pour votre site
+        for keyword, positions in keyword_positions.items():
+            if len(positions) >= 2:
+                # Trier par date (plus récent en premier)
+                positions.sort(key=lambda x: x['scraped_at'], reverse=True)
+                latest = positions[0]
+                previous = positions[1]
                 
-                top_competitors.append({
-                    "name": row[0],
-                    "domain": row[1],
-                    "share_of_voice": competitor_share,
-                    "avg_position": float(row[2]) if row[2] else None,
-                    "trend": "stable"  # TODO: calculer la vraie tendance
+                if latest['position'] and previous['position']:
+                    position_diff = previous['position'] - latest['position']
+                    if abs(position_diff) >= 1:  # Changement d'au moins 1 position
+                        change_type = "amélioration" if position_diff > 0 else "dégradation"
+                        recent_changes.append({
+                            "type": "position",
+                            "keyword": keyword,
+                            "change": f"{change_type} de {abs(position_diff)} position{'s' if abs(position_diff) > 1 else ''} (#{previous['position']} → #{latest['position']})",
+                            "date": latest['scraped_at'].isoformat()
+                        })
+        
+        # Si pas de changements de position pour votre site, indiquer explicitement
+        if len(recent_changes) == 0:
+            if project.reference_site:
+                recent_changes.append({
+                    "type": "info",
+                    "keyword": "Aucun changement récent",
+                    "change": f"Pas de changement de position détecté pour {project.reference_site} dans les dernières 48h",
+                    "date": datetime.utcnow().isoformat()
                 })
-            
-            # Si pas assez de concurrents réels, compléter avec des exemples
-            if len(top_competitors) < 3:
-                demo_competitors = [
-                    {"name": "Amazon", "domain": "amazon.fr", "share_of_voice": 24.5, "avg_position": 3.2, "trend": "up"},
-                    {"name": "Fnac", "domain": "fnac.com", "share_of_voice": 18.7, "avg_position": 5.8, "trend": "stable"},
-                    {"name": "Cdiscount", "domain": "cdiscount.com", "share_of_voice": 15.3, "avg_position": 7.1, "trend": "down"}
-                ]
-                top_competitors.extend(demo_competitors[len(top_competitors):])
-            
-            # 10. Changements récents réels pour VOTRE site uniquement (détection de vrais changements de position)
-            # Chercher les changements de position dans les dernières 48h pour votre site
-            position_changes_query = select(
-                Keyword.keyword,
-                SerpResult.position,
-                SerpResult.scraped_at,
-                SerpResult.domain
-            ).select_from(
-                Keyword.__table__.join(
-                    SerpResult.__table__,
-                    and_(
-                        Keyword.id == SerpResult.keyword_id,
-                        Keyword.project_id == project_id,
-                        SerpResult.scraped_at >= datetime.utcnow() - timedelta(days=2),  # 2 jours pour comparer
-                        SerpResult.domain.like(f"%{project.reference_site}%") if project.reference_site else False
-                    )
-                )
-            ).order_by(
-                Keyword.keyword,
-                desc(SerpResult.scraped_at)
-            ).limit(50)  # Augmenter pour avoir plus de données à analyser
-            
-            position_changes_result = await self.session.execute(position_changes_query)
-            position_changes_data = position_changes_result.fetchall()
-            
-            recent_changes = []
-            
-            # Analyser les changements par mot-clé pour votre site
-            keyword_positions = {}
-            for row in position_changes_data:
-                keyword = row[0]
-                position = row[1]
-                scraped_at = row[2]
-                domain = row[3]
-                
-                if keyword not in keyword_positions:
-                    keyword_positions[keyword] = []
-                keyword_positions[keyword].append({
-                    'position': position,
-                    'scraped_at': scraped_at,
-                    'domain': domain
+            else:
+                recent_changes.append({
+                    "type": "info",
+                    "keyword": "Site de référence non défini",
+                    "change": "Définissez votre site de référence dans les paramètres du projet pour voir les changements",
+                    "date": datetime.utcnow().isoformat()
                 })
+        
+        # Limiter à 3 changements maximum
+        recent_changes = recent_changes[:3]
+        
+        dashboard_data = DashboardResponse(
+            project_id=project_id,
+            project_name=project.name,
+            metrics=metrics,
+            top_keywords=top_keywords,
+            top_competitors=top_competitors,
+            recent_changes=recent_changes
+        )
+        
+        return dashboard_data
+    
+    async def get_dashboard_metrics(self, project_id: str) -> DashboardResponse:
+        """Récupérer les métriques du dashboard avec de vraies données."""
+        logger.info("Récupération métriques dashboard", project_id=project_id)
+        
+        try:
+            # Récupérer le projet
+            project_result = await self.session.execute(
+                PROJECT_BY_ID_STMT, {"project_id": project_id}
+            )
+            project = project_result.one_or_none()
             
-            # Détecter les changements significatifs pour votre site
-            for keyword, positions in keyword_positions.items():
-                if len(positions) >= 2:
-                    # Trier par date (plus récent en premier)
-                    positions.sort(key=lambda x: x['scraped_at'], reverse=True)
-                    latest = positions[0]
-                    previous = positions[1]
-                    
-                    if latest['position'] and previous['position']:
-                        position_diff = previous['position'] - latest['position']
-                        if abs(position_diff) >= 1:  # Changement d'au moins 1 position
-                            change_type = "amélioration" if position_diff > 0 else "dégradation"
-                            recent_changes.append({
-                                "type": "position",
-                                "keyword": keyword,
-                                "change": f"{change_type} de {abs(position_diff)} position{'s' if abs(position_diff) > 1 else ''} (#{previous['position']} → #{latest['position']})",
-                                "date": latest['scraped_at'].isoformat()
-                            })
-            
-            # Si pas de changements de position pour votre site, indiquer explicitement
-            if len(recent_changes) == 0:
-                if project.reference_site:
-                    recent_changes.append({
-                        "type": "info",
-                        "keyword": "Aucun changement récent",
-                        "change": f"Pas de changement de position détecté pour {project.reference_site} dans les dernières 48h",
-                        "date": datetime.utcnow().isoformat()
-                    })
-                else:
-                    recent_changes.append({
-                        "type": "info",
-                        "keyword": "Site de référence non défini",
-                        "change": "Définissez votre site de référence dans les paramètres du projet pour voir les changements",
-                        "date": datetime.utcnow().isoformat()
-                    })
+            if not project:
+                raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
             
-            # Limiter à 3 changements maximum
-            recent_changes = recent_changes[:3]
+            recent_since = datetime.utcnow() - timedelta(days=7)  # Dernière semaine
+            
+            # Les agrégats sont indépendants : on les exécute en parallèle
+            (
+                keywords_row,             # 1. Mots-clés actifs
+                competitors_row,          # 2. Concurrents
+                avg_position_row,         # 3. Position moyenne réelle
+                total_appearances_row,    # 4. Apparitions récentes
+                visibility_data,          # 5. Score de visibilité (positions moyennes)
+                opportunities_row,        # 6. Opportunités (positions 11-20)
+                last_scrape_row           # 7. Date du dernier scraping
+            ) = await self._fetch_rows_concurrently(
+                (
+                    DASHBOARD_KEYWORDS_STMT,
+                    DASHBOARD_COMPETITORS_STMT,
+                    DASHBOARD_AVG_POSITION_STMT,
+                    DASHBOARD_APPEARANCES_STMT,
+                    DASHBOARD_VISIBILITY_STMT,
+                    DASHBOARD_OPPORTUNITIES_STMT,
+                    DASHBOARD_LAST_SCRAPE_STMT
+                ),
+                {"project_id": project_id, "since": recent_since}
+            )
             
-            dashboard_data = DashboardResponse(
-                project_id=project_id,
-                project_name=project.name,
-                metrics=metrics,
-                top_keywords=top_keywords,
-                top_competitors=top_competitors,
-                recent_changes=recent_changes
+            total_appearances = total_appearances_row[0] or 0
+            metrics = build_dashboard_metrics(
+                total_keywords=keywords_row[0] or 0,
+                total_competitors=competitors_row[0] or 0,
+                average_position=avg_position_row[0],
+                total_appearances=total_appearances,
+                visibility_data=visibility_data,
+                total_opportunities=opportunities_row[0] or 0,
+                last_scrape_date=last_scrape_row[0]
             )
             
+            dashboard_data = await self._build_dashboard(project, metrics, total_appearances)
+            
             logger.info("Métriques dashboard calculées avec vraies données", 
                        keywords=metrics.total_keywords,
                        competitors=metrics.total_competitors,
@@ -349,6 +552,51 @@ class AnalyticsService:
             logger.error("Erreur calcul métriques dashboard", error=str(e))
             raise HTTPException(status_code=500, detail="Erreur lors du calcul des métriques")
     
+    async def get_dashboard_metrics_batch(self, project_ids: List[str]) -> Dict[str, DashboardResponse]:
+        """Récupérer les dashboards de plusieurs projets en un seul passage.
+        
+        Les agrégats sont calculés par GROUP BY project_id ; seules les parties
+        propres à chaque projet (tops, changements récents) sont exécutées
+        en parallèle. Les projets inconnus sont ignorés.
+        """
+        logger.info("Récupération métriques dashboard (lot)", project_count=len(project_ids))
+        
+        params = {"project_ids": list(project_ids), "since": datetime.utcnow() - timedelta(days=7)}
+        projects = (await self.session.execute(BATCH_PROJECTS_STMT, params)).all()
+        if not projects:
+            return {}
+        
+        keywords_counts = dict((await self.session.execute(BATCH_KEYWORDS_STMT, params)).all())
+        competitors_counts = dict((await self.session.execute(BATCH_COMPETITORS_STMT, params)).all())
+        serp_stats = {
+            row[0]: row[1:]
+            for row in (await self.session.execute(BATCH_SERP_STMT, params)).all()
+        }
+        
+        semaphore = asyncio.Semaphore(BATCH_DASHBOARD_CONCURRENCY)
+        
+        async def build(project) -> DashboardResponse:
+            avg_position, appearances, opportunities, last_scrape = serp_stats.get(
+                project.id, (None, 0, 0, None)
+            )
+            total_appearances = appearances or 0
+            metrics = build_dashboard_metrics(
+                total_keywords=keywords_counts.get(project.id, 0),
+                total_competitors=competitors_counts.get(project.id, 0),
+                average_position=avg_position,
+                total_appearances=total_appearances,
+                visibility_data=(avg_position, total_appearances),
+                total_opportunities=opportunities or 0,
+                last_scrape_date=last_scrape
+            )
+            async with semaphore, AsyncSessionLocal() as session:
+                return await AnalyticsService(session)._build_dashboard(
+                    project, metrics, total_appearances
+                )
+        
+        dashboards = await asyncio.gather(*(build(project) for project in projects))
+        return {dashboard.project_id: dashboard for dashboard in dashboards}
+    
     async def get_share_of_voice(
         self,
         project_id: str,
@@ -359,9 +607,10 @@ class AnalyticsService:
         logger.info("Récupération Share of Voice", project_id=project_id)
         
         # Vérifier que le projet existe
-        project_query = select(Project).where(Project.id == project_id)
-        project_result = await self.session.execute(project_query)
-        project = project_result.scalar_one_or_none()
+        project_result = await self.session.execute(
+            PROJECT_BY_ID_STMT, {"project_id": project_id}
+        )
+        project = project_result.one_or_none()
         
         if not project:
             raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
@@ -372,39 +621,25 @@ class AnalyticsService:
         if not period_start:
             period_start = period_end - timedelta(days=30)
         
+        period_params = {
+            "project_id": project_id,
+            "period_start": period_start,
+            "period_end": period_end
+        }
+        
         # Calculer le total des apparitions dans la période
-        total_appearances_query = select(func.count(SerpResult.id)).where(
-            and_(
-                SerpResult.project_id == project_id,
-                SerpResult.scraped_at.between(period_start, period_end)
-            )
+        total_appearances_result = await self.session.execute(
+            SOV_TOTAL_APPEARANCES_STMT, period_params
         )
-        total_appearances_result = await self.session.execute(total_appearances_query)
         total_appearances = total_appearances_result.scalar() or 0
         
         # Calculer le Share of Voice par domaine (incluant le site principal)
-        domain_share_query = select(
-            SerpResult.domain,
-            SerpResult.merchant_name,
-            func.count(SerpResult.id).label('appearances'),
-            func.avg(SerpResult.position).label('avg_position')
-        ).where(
-            and_(
-                SerpResult.project_id == project_id,
-                SerpResult.scraped_at.between(period_start, period_end),
-                SerpResult.domain.isnot(None)
-            )
-        ).group_by(
-            SerpResult.domain, SerpResult.merchant_name
-        ).order_by(
-            desc('appearances')
-        )
-        
-        domain_share_result = await self.session.execute(domain_share_query)
+        domain_share_result = await self.session.execute(SOV_BY_DOMAIN_STMT, period_params)
         domain_share_data = domain_share_result.fetchall()
         
         # Construire la liste des concurrents selon le schéma ShareOfVoiceItem
-        from app.schemas.analytics import ShareOfVoiceItem
+        # (l'agrégation est faite en SQL, il ne reste qu'une mise à l'échelle par ligne)
+        share_factor = 100 / total_appearances if total_appearances > 0 else 0.0
         
         competitors = []
         for row in domain_share_data:
@@ -412,7 +647,7 @@ class AnalyticsService:
             merchant_name = row[1]
             appearances = row[2]
             avg_position = float(row[3]) if row[3] else 0.0
-            share_percentage = (appearances / max(total_appearances, 1)) * 100 if total_appearances > 0 else 0.0
+            share_percentage = appearances * share_factor
             
             # Créer un ID fictif pour le concurrent (utiliser le domaine)
             competitor_item = ShareOfVoiceItem(
@@ -436,17 +671,33 @@ class AnalyticsService:
         )
     
     # Autres méthodes simplifiées pour éviter les erreurs
-    async def get_position_matrix(self, project_id: str) -> PositionMatrixResponse:
-        """Position matrix simplifiée."""
-        start_date = datetime.utcnow() - timedelta(days=30)
-        end_date = datetime.utcnow()
+    async def get_position_matrix(
+        self,
+        project_id: str,
+        period_start: Optional[datetime] = None,
+        period_end: Optional[datetime] = None
+    ) -> PositionMatrixResponse:
+        """Matrice des meilleures positions par mot-clé et par domaine.
+        
+        Le pivot domaine -> meilleure position est agrégé par la base ; la matrice
+        est ensuite construite directement par compute_position_matrix.
+        """
+        end_date = period_end or datetime.utcnow()
+        start_date = period_start or (end_date - timedelta(days=30))
+        
+        reference_site = await self.get_reference_site(project_id)
+        result = await self.session.execute(
+            POSITION_MATRIX_STMT,
+            {"project_id": project_id, "period_start": start_date, "period_end": end_date}
+        )
+        matrix, competitor_domains = compute_position_matrix(result.all(), reference_site)
         
         return PositionMatrixResponse(
             project_id=project_id,
             period_start=start_date,
             period_end=end_date,
-            keywords=[],
-            competitor_domains=[]
+            keywords=[PositionMatrixItem(**item) for item in matrix],
+            competitor_domains=competitor_domains
         )
     
     async def get_opportunities(self, project_id: str) -> OpportunitiesResponse:
@@ -461,53 +712,40 @@ class AnalyticsService:
             opportunities=[]
         ) 
 
-    async def get_keywords_positions(self, project_id: str):
-        """Récupérer les positions détaillées de tous les mots-clés avec historique."""
-        logger.info("Récupération positions détaillées", project_id=project_id)
-        
-        # Vérifier que le projet existe et récupérer le reference_site
-        project_query = select(Project).where(Project.id == project_id)
-        project_result = await self.session.execute(project_query)
-        project = project_result.scalar_one_or_none()
+    async def get_reference_site(self, project_id: str) -> str:
+        """Vérifier que le projet existe et récupérer son site de référence."""
+        project_result = await self.session.execute(
+            PROJECT_BY_ID_STMT, {"project_id": project_id}
+        )
+        project = project_result.one_or_none()
         
         if not project:
             raise HTTPException(status_code=404, detail=f"Projet {project_id} non trouvé")
         
-        reference_site = project.reference_site or "somfy.fr"
-        
-        # Récupérer tous les mots-clés du projet
-        keywords_query = select(Keyword).where(Keyword.project_id == project_id)
-        keywords_result = await self.session.execute(keywords_query)
-        keywords = keywords_result.scalars().all()
-        
-        keywords_positions = []
+        return project.reference_site or "somfy.fr"
+
+    async def iter_keywords_positions(
+        self, project_id: str, reference_site: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Itérer sur les positions des mots-clés sans charger tout le projet en mémoire."""
+        # Récupérer les mots-clés du projet au fil de l'eau
+        keywords = await self.session.stream(
+            KEYWORDS_BY_PROJECT_STMT, {"project_id": project_id}
+        )
         
-        for keyword in keywords:
-            # Récupérer les 2 dernières positions pour ce mot-clé et ce domaine
-            positions_query = select(
-                SerpResult.position,
-                SerpResult.url,
-                SerpResult.scraped_at
-            ).where(
-                and_(
-                    SerpResult.keyword_id == keyword.id,
-                    SerpResult.domain == reference_site,
-                    SerpResult.position.isnot(None)
-                )
-            ).order_by(desc(SerpResult.scraped_at)).limit(2)
+        async for keyword in keywords:
+            keyword_params = {"keyword_id": keyword.id, "domain": reference_site}
             
-            positions_result = await self.session.execute(positions_query)
+            # Récupérer les 2 dernières positions pour ce mot-clé et ce domaine
+            positions_result = await self.session.execute(
+                KEYWORD_LAST_POSITIONS_STMT, keyword_params
+            )
             positions = positions_result.fetchall()
             
             # Compter le nombre total d'URLs qui se sont positionnées
-            urls_count_query = select(func.count(func.distinct(SerpResult.url))).where(
-                and_(
-                    SerpResult.keyword_id == keyword.id,
-                    SerpResult.domain == reference_site,
-                    SerpResult.url.isnot(None)
-                )
+            urls_count_result = await self.session.execute(
+                KEYWORD_URLS_COUNT_STMT, keyword_params
             )
-            urls_count_result = await self.session.execute(urls_count_query)
             total_urls = urls_count_result.scalar() or 0
             
             # Extraire les positions
@@ -528,7 +766,7 @@ class AnalyticsService:
             elif not current_position and previous_position:
                 trend = "lost"  # Position perdue
             
-            keywords_positions.append({
+            yield {
                 "keyword_id": keyword.id,
                 "keyword": keyword.keyword,
                 "search_volume": keyword.search_volume or 0,
@@ -538,7 +776,17 @@ class AnalyticsService:
                 "current_url": current_url,
                 "total_urls_positioned": total_urls,
                 "last_scraped": last_scraped
-            })
+            }
+
+    async def get_keywords_positions(self, project_id: str):
+        """Récupérer les positions détaillées de tous les mots-clés avec historique."""
+        logger.info("Récupération positions détaillées", project_id=project_id)
+        
+        reference_site = await self.get_reference_site(project_id)
+        
+        keywords_positions = [
+            row async for row in self.iter_keywords_positions(project_id, reference_site)
+        ]
         
         # Trier par position actuelle (meilleures positions en premier)
         keywords_positions.sort(key=lambda x: x['current_position'] if x['current_position'] else 999)
@@ -549,4 +797,11 @@ class AnalyticsService:
             "total_keywords": len(keywords_positions),
             "positioned_keywords": len([k for k in keywords_positions if k['current_position']]),
             "keywords": keywords_positions
-        } 
\ No newline at end of file
+        }
+
+
+async def get_analytics_service(
+    session: AsyncSession = Depends(get_async_session)
+) -> AnalyticsService:
+    """Dépendance FastAPI : service analytics lié à la session de la requête."""
+    return AnalyticsService(session)
@@ -13,6 +13,14 @@ from app.config import settings
 
 logger = structlog.get_logger()
 
+# Suppression atomique d'un verrou, uniquement par son détenteur (jeton identique)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 class CacheService:
     """Service de cache Redis pour les calculs analytics."""
@@ -21,6 +29,7 @@ class CacheService:
         self.redis_client: Optional[redis.Redis] = None
         self.default_ttl = 3600  # 1 heure par défaut
         self.cache_prefix = "shopping_monitor"
+        self.stats = {"hits": 0, "misses": 0}
     
     async def connect(self):
         """Initialise la connexion Redis."""
@@ -49,8 +58,16 @@ class CacheService:
         params_str = json.dumps(kwargs, sort_keys=True, default=str)
         params_hash = hashlib.md5(params_str.encode()).hexdigest()
         
+        # Les clés d'un projet sont regroupées sous project:{id} pour l'invalidation
+        project_id = kwargs.get("project_id")
+        if project_id is not None:
+            return f"{self.cache_prefix}:project:{project_id}:{prefix}:{params_hash}"
         return f"{self.cache_prefix}:{prefix}:{params_hash}"
     
+    def analytics_key(self, endpoint: str, project_id: str, **params) -> str:
+        """Clé de cache d'une réponse analytics (endpoint, projet, période)."""
+        return self._generate_cache_key(endpoint, project_id=str(project_id), **params)
+    
     async def get(self, cache_key: str) -> Optional[Any]:
         """Récupère une valeur du cache."""
         if not self.redis_client:
@@ -68,6 +85,34 @@ class CacheService:
             logger.error("Erreur lecture cache", error=str(e), cache_key=cache_key)
             return None
     
+    async def get_raw(self, cache_key: str) -> Optional[str]:
+        """Récupère une valeur déjà sérialisée (JSON) du cache, sans la décoder."""
+        if not self.redis_client:
+            return None
+        
+        try:
+            cached_data = await self.redis_client.get(cache_key)
+            if cached_data is not None:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+            return cached_data
+        except Exception as e:
+            logger.error("Erreur lecture cache", error=str(e), cache_key=cache_key)
+            return None
+    
+    async def set_raw(self, cache_key: str, payload: bytes, ttl: Optional[int] = None) -> bool:
+        """Stocke une valeur déjà sérialisée (JSON) dans le cache."""
+        if not self.redis_client:
+            return False
+        
+        try:
+            await self.redis_client.set(cache_key, payload, ex=ttl or self.default_ttl)
+            return True
+        except Exception as e:
+            logger.error("Erreur écriture cache", error=str(e), cache_key=cache_key)
+            return False
+    
     async def set(self, cache_key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Stocke une valeur dans le cache."""
         if not self.redis_client:
@@ -103,7 +148,12 @@ class CacheService:
             return 0
         
         try:
-            keys = await self.redis_client.keys(f"{self.cache_prefix}:{pattern}*")
+            # SCAN plutôt que KEYS pour ne pas bloquer Redis
+            keys = [
+                key async for key in self.redis_client.scan_iter(
+                    match=f"{self.cache_prefix}:{pattern}*", count=500
+                )
+            ]
             if keys:
                 deleted = await self.redis_client.delete(*keys)
                 logger.info("Cache pattern invalidated", pattern=pattern, deleted=deleted)
@@ -202,21 +252,48 @@ class CacheService:
         # TTL moyen pour les opportunités
         return await self.set(cache_key, data, 3600)  # 1 heure
     
+    async def get_analysis_status(self, project_id: str) -> Optional[Dict]:
+        """Récupère le statut de la dernière analyse SERP d'un projet."""
+        # Hors de l'espace project:{id} pour survivre à l'invalidation du cache projet
+        return await self.get(f"{self.cache_prefix}:analysis:{project_id}")
+    
+    async def set_analysis_status(self, project_id: str, data: Dict) -> bool:
+        """Stocke le statut de la dernière analyse SERP d'un projet."""
+        return await self.set(f"{self.cache_prefix}:analysis:{project_id}", data, 86400)  # 24 heures
+    
+    async def acquire_analysis_lock(self, project_id: str, token: str, ttl: int) -> bool:
+        """Pose le verrou d'analyse SERP d'un projet (SET NX), partagé entre workers.
+        
+        Sans Redis, le verrou est accordé : seule la réservation locale au
+        processus protège alors contre les analyses concurrentes.
+        """
+        if not self.redis_client:
+            return True
+        
+        try:
+            acquired = await self.redis_client.set(
+                f"{self.cache_prefix}:analysis_lock:{project_id}", token, nx=True, ex=ttl
+            )
+            return bool(acquired)
+        except Exception as e:
+            logger.error("Erreur pose verrou analyse", error=str(e), project_id=project_id)
+            return True
+    
+    async def release_analysis_lock(self, project_id: str, token: str) -> None:
+        """Libère le verrou d'analyse s'il appartient encore à ce job."""
+        if not self.redis_client:
+            return
+        
+        try:
+            await self.redis_client.eval(
+                _RELEASE_LOCK_SCRIPT, 1, f"{self.cache_prefix}:analysis_lock:{project_id}", token
+            )
+        except Exception as e:
+            logger.error("Erreur libération verrou analyse", error=str(e), project_id=project_id)
+    
     async def invalidate_project_cache(self, project_id: str):
         """Invalide tout le cache d'un projet."""
-        patterns = [
-            f"share_of_voice:*project_id*{project_id}*",
-            f"position_matrix:*project_id*{project_id}*",
-            f"dashboard:*project_id*{project_id}*",
-            f"opportunities:*project_id*{project_id}*",
-            f"trends:*project_id*{project_id}*",
-            f"competitors:*project_id*{project_id}*"
-        ]
-        
-        total_deleted = 0
-        for pattern in patterns:
-            deleted = await self.invalidate_pattern(pattern)
-            total_deleted += deleted
+        total_deleted = await self.invalidate_pattern(f"project:{project_id}:")
         
         logger.info("Cache projet invalidé", project_id=project_id, total_deleted=total_deleted)
         return total_deleted
@@ -4,7 +4,7 @@ from typing import List, Dict, Set, Optional, Any
 from collections import Counter
 from urllib.parse import urlparse
 import structlog
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Competitor, SerpResult, Project
@@ -185,10 +185,16 @@ class CompetitorDetectionService:
             Liste des domaines candidats avec leurs métriques
         """
         try:
-            # Récupérer tous les résultats SERP du projet
-            stmt = select(SerpResult).where(SerpResult.project_id == project_id)
+            # Récupérer uniquement les colonnes analysées (pas d'objets ORM à hydrater)
+            stmt = select(
+                SerpResult.domain,
+                SerpResult.position,
+                SerpResult.price,
+                SerpResult.title,
+                SerpResult.merchant_name
+            ).where(SerpResult.project_id == project_id)
             result = await self.session.execute(stmt)
-            serp_results = result.scalars().all()
+            serp_results = result.all()
             
             if not serp_results:
                 logger.info("Aucun résultat SERP trouvé", project_id=project_id)
@@ -473,8 +479,8 @@ class CompetitorDetectionService:
                 normalized_domain = self.normalize_domain(competitor.domain)
                 domain_to_competitor[normalized_domain] = competitor
             
-            # Récupérer les résultats SERP sans concurrent associé
-            serp_stmt = select(SerpResult).where(
+            # Récupérer les résultats SERP sans concurrent associé (id et domaine seulement)
+            serp_stmt = select(SerpResult.id, SerpResult.domain).where(
                 and_(
                     SerpResult.project_id == project_id,
                     SerpResult.competitor_id.is_(None),
@@ -482,17 +488,17 @@ class CompetitorDetectionService:
                 )
             )
             serp_result = await self.session.execute(serp_stmt)
-            serp_results = serp_result.scalars().all()
             
-            updated_count = 0
+            updates = []
+            for serp_id, domain in serp_result:
+                competitor = domain_to_competitor.get(self.normalize_domain(domain))
+                if competitor is not None:
+                    updates.append({"id": serp_id, "competitor_id": competitor.id})
             
-            for serp_result in serp_results:
-                normalized_domain = self.normalize_domain(serp_result.domain)
-                
-                if normalized_domain in domain_to_competitor:
-                    competitor = domain_to_competitor[normalized_domain]
-                    serp_result.competitor_id = competitor.id
-                    updated_count += 1
+            # Mise à jour groupée par clé primaire
+            if updates:
+                await self.session.execute(update(SerpResult), updates)
+            updated_count = len(updates)
             
             logger.info(
                 "Associations concurrents mises à jour",
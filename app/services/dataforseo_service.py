@@ -2,8 +2,10 @@
 
 import httpx
 import json
+import uuid
 import structlog
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -16,6 +18,9 @@ class DataForSEOService:
     """Service pour interagir avec l'API DataForSEO."""
     
     def __init__(self):
+        # Client HTTP partagé (connexions keep-alive), ouvert par connect()
+        self.client: Optional[httpx.AsyncClient] = None
+        
         # Credentials DataForSEO
         self.auth_header = "Basic dG9vbHNAc2xhc2hyLmZyOmQyODc2OTRmZjFiYmVjYzQ="
         self.base_url = "https://api.dataforseo.com/v3"
@@ -29,6 +34,31 @@ class DataForSEOService:
             "depth": 100
         }
     
+    async def connect(self):
+        """Ouvre le client HTTP partagé (connexions TLS réutilisées entre les appels)."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=120.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+            logger.info("Client DataForSEO initialisé")
+    
+    async def disconnect(self):
+        """Ferme le client HTTP partagé."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Client DataForSEO fermé")
+    
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Client partagé si connect() a été appelé, sinon client temporaire."""
+        if self.client is not None:
+            yield self.client
+        else:
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                yield client
+    
     async def get_serp_results(
         self, 
         keywords: List[str],
@@ -70,7 +100,7 @@ class DataForSEOService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with self._http_client() as client:
                 # Traiter chaque mot-clé individuellement
                 for keyword in keywords:
                     payload = [{
@@ -150,11 +180,15 @@ class DataForSEOService:
         from app.models.serp_result import SerpResult
         from app.models.competitor import Competitor
         from app.models.keyword import Keyword
-        from sqlalchemy import select
+        from sqlalchemy import insert, select
         from urllib.parse import urlparse
         
         logger.info("Début traitement résultats SERP", project_id=project_id)
         
+        # Résultats insérés en une seule fois à la fin (INSERT multi-lignes)
+        serp_rows: List[Dict[str, Any]] = []
+        scraped_at = datetime.utcnow()
+        
         stats = {
             "keywords_processed": 0,
             "shopping_results_found": 0,
@@ -263,7 +297,9 @@ class DataForSEOService:
                             competitor = None
                             if domain and domain not in competitors_map:
                                 # Créer un nouveau concurrent
+                                # ID généré ici : pas de flush nécessaire pour le référencer
                                 competitor = Competitor(
+                                    id=str(uuid.uuid4()),
                                     project_id=project_id,
                                     name=seller,
                                     domain=domain,
@@ -271,7 +307,6 @@ class DataForSEOService:
                                     is_main_brand=False
                                 )
                                 session.add(competitor)
-                                await session.flush()  # Pour obtenir l'ID
                                 competitors_map[domain] = competitor
                                 stats['competitors_detected'] += 1
                                 logger.info(f"Nouveau concurrent détecté: {seller} ({domain})")
@@ -289,23 +324,22 @@ class DataForSEOService:
                                 # Pas d'URL disponible - on laisse final_url à None
                                 logger.debug(f"Aucune URL disponible pour {title}")
                             
-                            serp_result = SerpResult(
-                                project_id=project_id,
-                                keyword_id=keyword_obj.id,
-                                competitor_id=competitor.id if competitor else None,
-                                scraped_at=datetime.utcnow(),
-                                position=shopping_position,  # Position dans les résultats shopping (1, 2, 3...)
-                                url=final_url,  # URL réelle du produit ou URL de recherche
-                                domain=domain,
-                                title=title,
-                                description=description,
-                                price=price,
-                                currency=currency,
-                                merchant_name=seller,
-                                rating=rating
-                            )
-                            
-                            session.add(serp_result)
+                            serp_rows.append({
+                                "id": str(uuid.uuid4()),
+                                "project_id": project_id,
+                                "keyword_id": keyword_obj.id,
+                                "competitor_id": competitor.id if competitor else None,
+                                "scraped_at": scraped_at,
+                                "position": shopping_position,  # Position dans les résultats shopping (1, 2, 3...)
+                                "url": final_url,  # URL réelle du produit ou URL de recherche
+                                "domain": domain,
+                                "title": title,
+                                "description": description,
+                                "price": price,
+                                "currency": currency,
+                                "merchant_name": seller,
+                                "rating": rating
+                            })
                             stats['shopping_results_saved'] += 1
                             
                         except Exception as e:
@@ -313,8 +347,10 @@ class DataForSEOService:
                             stats['errors'].append(error_msg)
                             logger.error(error_msg)
         
-        # Sauvegarder en base
+        # Sauvegarder en base (les nouveaux concurrents sont flushés avant l'INSERT)
         try:
+            if serp_rows:
+                await session.execute(insert(SerpResult), serp_rows)
             await session.commit()
             logger.info("Résultats SERP sauvegardés", **stats)
         except Exception as e:
@@ -388,4 +424,13 @@ class DataForSEOService:
             "analysis_date": datetime.utcnow().isoformat(),
             "stats": stats,
             "raw_data": serp_data  # Pour debug, peut être retiré en prod
-        } 
\ No newline at end of file
+        }
+
+
+# Instance globale du service DataForSEO
+dataforseo_service = DataForSEOService()
+
+
+async def get_dataforseo_service() -> DataForSEOService:
+    """Dépendance FastAPI pour le service DataForSEO."""
+    return dataforseo_service
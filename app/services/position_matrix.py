@@ -0,0 +1,59 @@
+"""Calcul de la matrice de positions à partir du pivot agrégé par la base."""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Nombre maximum de domaines (colonnes) dans la matrice
+MAX_MATRIX_DOMAINS = 15
+
+
+def compute_position_matrix(
+    rows: Sequence[Tuple[str, str, Optional[int], Dict[str, int]]],
+    reference_site: Optional[str],
+    max_domains: int = MAX_MATRIX_DOMAINS
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Construire la matrice mots-clés x domaines.
+
+    Args:
+        rows: (keyword_id, keyword, search_volume, meilleure position par domaine),
+            le pivot domaine -> position étant agrégé par la base
+        reference_site: Domaine du site suivi, utilisé pour le score d'opportunité
+        max_domains: Nombre de domaines retenus (les plus présents)
+
+    Returns:
+        Les lignes de la matrice et la liste des domaines retenus
+    """
+    domain_counts = Counter(domain for row in rows for domain in row[3])
+    competitor_domains = [domain for domain, _ in domain_counts.most_common(max_domains)]
+
+    reference = reference_site.replace("www.", "") if reference_site else None
+    matrix = []
+    for keyword_id, keyword, search_volume, positions in rows:
+        values = list(positions.values())
+
+        reference_position = None
+        if reference:
+            reference_position = min(
+                (pos for domain, pos in positions.items() if reference in domain),
+                default=None
+            )
+
+        # Score d'opportunité (0-100) : absent = 100, position 1 = 0
+        if reference_position is None:
+            opportunity_score = 100
+        else:
+            opportunity_score = min(100, (reference_position - 1) * 5)
+
+        matrix.append({
+            "keyword": keyword,
+            "keyword_id": keyword_id,
+            "search_volume": search_volume,
+            "competitors": {domain: positions.get(domain) for domain in competitor_domains},
+            "best_position": min(values) if values else None,
+            "worst_position": max(values) if values else None,
+            "opportunity_score": opportunity_score
+        })
+
+    matrix.sort(key=lambda item: (-(item["search_volume"] or 0), item["keyword"]))
+    return matrix, competitor_domains
+
@@ -5,13 +5,14 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 from uuid import UUID
 import structlog
-from sqlalchemy import select, and_
+from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Project, Keyword, SerpResult, Competitor
+from app.models import Project, Keyword, SerpResult, SerpResultRaw, Competitor
 from app.services.dataforseo_client import DataForSEOClient
 from app.services.url_deduplication import URLDeduplicationService
 from app.services.competitor_detection import CompetitorDetectionService
+from app.models.domain import url_netloc
 from app.core.exceptions import (
     DatabaseError,
     ScrapingError,
@@ -242,8 +243,10 @@ class ScrapingService:
                     rating=product_data.get("rating"),
                     reviews_count=product_data.get("reviews_count"),
                     image_url=product_data.get("image_url"),
-                    additional_images=product_data.get("additional_images"),
-                    raw_data=item  # Données brutes complètes
+                    raw=SerpResultRaw(
+                        additional_images=product_data.get("additional_images"),
+                        raw_data=item  # Données brutes complètes
+                    )
                 )
                 
                 self.session.add(serp_result)
@@ -360,19 +363,8 @@ class ScrapingService:
         Returns:
             Domaine extrait
         """
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Supprimer www.
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            return domain
-            
-        except Exception:
-            return ""
+        # Hôte sans www.
+        return url_netloc(url).removeprefix('www.')
     
     async def scrape_project(
         self,
@@ -544,14 +536,14 @@ class ScrapingService:
             
             # Compter les résultats par date
             if last_scrape:
-                count_stmt = select(SerpResult).where(
+                count_stmt = select(func.count(SerpResult.id)).where(
                     and_(
                         SerpResult.project_id == project_id,
                         SerpResult.scraped_at >= last_scrape.date()
                     )
                 )
                 count_result = await self.session.execute(count_stmt)
-                recent_results = len(count_result.scalars().all())
+                recent_results = count_result.scalar_one()
             else:
                 recent_results = 0
             
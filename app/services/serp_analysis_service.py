@@ -5,12 +5,12 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
+from sqlalchemy.orm import undefer_group
 from collections import defaultdict, Counter
 
 from app.models.keyword import Keyword
 from app.models.serp_result import SerpResult
-from app.models.unique_url import UniqueUrl
-from app.models.serp_url_mapping import SerpUrlMapping
+from app.models.unique_url import UniqueUrl, SerpUrlMapping
 from app.models.project import Project
 
 logger = structlog.get_logger()
@@ -141,7 +141,7 @@ class SerpAnalysisService:
         
         for serp_result, url_mapping, unique_url in serp_data:
             domain = unique_url.domain
-            position = url_mapping.position
+            position = serp_result.position
             
             domain_stats[domain]["positions"].append(position)
             domain_stats[domain]["keywords"].add(serp_result.keyword_id)
@@ -197,7 +197,9 @@ class SerpAnalysisService:
             SerpUrlMapping, SerpResult.id == SerpUrlMapping.serp_result_id
         ).join(
             UniqueUrl, SerpUrlMapping.unique_url_id == UniqueUrl.id
-        ).where(Keyword.project_id == project_id)
+        ).where(Keyword.project_id == project_id).options(
+            undefer_group("detail")
+        )
         
         results = await self.session.execute(query)
         data = results.all()
@@ -216,8 +218,8 @@ class SerpAnalysisService:
             keywords_matrix[kw_id]["volume"] = keyword.search_volume
             keywords_matrix[kw_id]["positions"].append({
                 "domain": unique_url.domain,
-                "position": url_mapping.position,
-                "title": url_mapping.title,
+                "position": serp_result.position,
+                "title": serp_result.title,
                 "url": unique_url.url
             })
         
@@ -1,18 +1,58 @@
 """Service de déduplication des URLs pour Shopping Monitor."""
 
 import hashlib
+import uuid
 from typing import List, Dict, Optional, Set, Any
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from datetime import datetime, timedelta
 import structlog
-from sqlalchemy import select, and_, or_
+from sqlalchemy import event, insert, select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models import UniqueUrl, SerpUrlMapping, SerpResult
+from app.models.domain import url_netloc
 from app.core.exceptions import DatabaseError
 
+if settings.database_url.startswith("sqlite"):
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+else:
+    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
 logger = structlog.get_logger()
 
+# Insertion des nouvelles URLs uniques : les URLs déjà en base sont ignorées
+# sans erreur et seules les lignes réellement insérées sont retournées
+INSERT_UNIQUE_URL_IGNORE_STMT = (
+    dialect_insert(UniqueUrl)
+    .on_conflict_do_nothing(index_elements=[UniqueUrl.url])
+    .returning(UniqueUrl.url, UniqueUrl.id)
+)
+
+# URLs uniques connues du processus (URL normalisée -> ID), toutes avec données
+# produit. Les URLs uniques ne sont jamais supprimées : une entrée reste valide.
+_KNOWN_UNIQUE_URLS: Dict[str, str] = {}
+_KNOWN_UNIQUE_URLS_MAX_SIZE = 100_000
+_PENDING_KNOWN_URLS_KEY = "pending_known_unique_urls"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_known_unique_urls(session: Session) -> None:
+    """Ajouter au cache du processus les URLs uniques d'une transaction validée."""
+    pending = session.info.pop(_PENDING_KNOWN_URLS_KEY, None)
+    if not pending:
+        return
+    if len(_KNOWN_UNIQUE_URLS) + len(pending) > _KNOWN_UNIQUE_URLS_MAX_SIZE:
+        _KNOWN_UNIQUE_URLS.clear()
+    _KNOWN_UNIQUE_URLS.update(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_unique_urls(session: Session) -> None:
+    """Oublier les URLs uniques d'une transaction annulée."""
+    session.info.pop(_PENDING_KNOWN_URLS_KEY, None)
+
 
 class URLDeduplicationService:
     """Service pour la déduplication et gestion des URLs uniques."""
@@ -119,18 +159,8 @@ class URLDeduplicationService:
         Returns:
             Domaine extrait
         """
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Supprimer www.
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            return domain
-            
-        except Exception:
-            return ""
+        # Hôte sans www.
+        return url_netloc(url).removeprefix('www.')
     
     async def get_or_create_unique_url(
         self,
@@ -211,8 +241,9 @@ class URLDeduplicationService:
         )
         
         deduplicated = []
-        seen_urls = set()
-        url_to_unique_id = {}
+        # URL normalisée -> URL source et données produit de la première occurrence
+        batch_urls: Dict[str, Dict[str, Any]] = {}
+        scraped_at = datetime.now().isoformat()
         
         try:
             for result in serp_results:
@@ -221,48 +252,41 @@ class URLDeduplicationService:
                     continue
                 
                 normalized_url = self.normalize_url(url)
+                result["normalized_url"] = normalized_url
+                deduplicated.append(result)
                 
-                # Vérifier si on a déjà traité cette URL
-                if normalized_url in seen_urls:
-                    # Ajouter l'ID de l'URL unique existante
-                    result["unique_url_id"] = url_to_unique_id[normalized_url]
-                    deduplicated.append(result)
+                # Vérifier si on a déjà traité cette URL dans le lot
+                if normalized_url in batch_urls:
                     continue
                 
                 # Extraire les données produit du résultat SERP
-                product_data = {
-                    "title": result.get("title"),
-                    "description": result.get("description"),
-                    "price": result.get("price"),
-                    "currency": result.get("currency"),
-                    "merchant": result.get("merchant", {}).get("name"),
-                    "rating": result.get("rating", {}).get("rating_value"),
-                    "reviews_count": result.get("rating", {}).get("reviews_count"),
-                    "image_url": result.get("image_url"),
-                    "scraped_at": datetime.now().isoformat()
+                batch_urls[normalized_url] = {
+                    "url": url,
+                    "product_data": {
+                        "title": result.get("title"),
+                        "description": result.get("description"),
+                        "price": result.get("price"),
+                        "currency": result.get("currency"),
+                        "merchant": result.get("merchant", {}).get("name"),
+                        "rating": result.get("rating", {}).get("rating_value"),
+                        "reviews_count": result.get("rating", {}).get("reviews_count"),
+                        "image_url": result.get("image_url"),
+                        "scraped_at": scraped_at
+                    }
                 }
-                
-                # Créer ou récupérer l'URL unique
-                unique_url = await self.get_or_create_unique_url(
-                    url=url,
-                    product_data=product_data
-                )
-                
-                # Ajouter à nos structures de tracking
-                seen_urls.add(normalized_url)
-                url_to_unique_id[normalized_url] = unique_url.id
-                
-                # Ajouter l'ID à notre résultat
-                result["unique_url_id"] = unique_url.id
-                result["normalized_url"] = normalized_url
-                
-                deduplicated.append(result)
+            
+            # Résoudre toutes les URLs uniques du lot en une fois
+            url_to_unique_id = await self._resolve_unique_urls(batch_urls)
+            
+            # Ajouter l'ID de l'URL unique à chaque résultat
+            for result in deduplicated:
+                result["unique_url_id"] = url_to_unique_id[result["normalized_url"]]
             
             logger.info(
                 "Déduplication terminée",
                 original_count=len(serp_results),
                 deduplicated_count=len(deduplicated),
-                unique_urls=len(seen_urls)
+                unique_urls=len(batch_urls)
             )
             
             return deduplicated
@@ -278,11 +302,85 @@ class URLDeduplicationService:
                 details={"error": str(e)}
             )
     
+    async def _resolve_unique_urls(
+        self,
+        batch_urls: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, str]:
+        """
+        Récupère ou crée les URLs uniques d'un lot.
+        
+        Les URLs déjà vues par le processus sont résolues sans requête ; les
+        autres passent par un seul INSERT ... ON CONFLICT DO NOTHING multi-lignes,
+        puis seules les URLs en conflit sont relues.
+        
+        Args:
+            batch_urls: URL normalisée -> URL source et données produit
+            
+        Returns:
+            Mapping URL normalisée -> ID de l'URL unique
+        """
+        if not batch_urls:
+            return {}
+        
+        now = datetime.now()
+        
+        # URLs déjà connues du processus : aucun aller-retour SQL
+        url_to_unique_id = {
+            normalized_url: _KNOWN_UNIQUE_URLS[normalized_url]
+            for normalized_url in batch_urls
+            if normalized_url in _KNOWN_UNIQUE_URLS
+        }
+        
+        # Autres URLs : INSERT ... ON CONFLICT DO NOTHING, domaines calculés pour tout le lot
+        new_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "url": normalized_url,
+                "domain": self.extract_domain(entry["url"]),
+                "product_data": entry["product_data"],
+                "scraping_status": "completed",
+                "last_scraped": now
+            }
+            for normalized_url, entry in batch_urls.items()
+            if normalized_url not in url_to_unique_id
+        ]
+        created_count = 0
+        
+        if new_rows:
+            result = await self.session.execute(INSERT_UNIQUE_URL_IGNORE_STMT, new_rows)
+            resolved = dict(result.tuples())
+            created_count = len(resolved)
+            
+            # URLs en conflit (déjà en base) : compléter les données produit manquantes
+            conflicting_urls = [row["url"] for row in new_rows if row["url"] not in resolved]
+            if conflicting_urls:
+                stmt = select(UniqueUrl).where(UniqueUrl.url.in_(conflicting_urls))
+                result = await self.session.execute(stmt)
+                for unique_url in result.scalars():
+                    if not unique_url.product_data:
+                        unique_url.product_data = batch_urls[unique_url.url]["product_data"]
+                        unique_url.scraping_status = "completed"
+                        unique_url.last_scraped = now
+                    resolved[unique_url.url] = unique_url.id
+            
+            url_to_unique_id.update(resolved)
+            
+            # Publiées dans le cache du processus au commit de la session
+            self.session.info.setdefault(_PENDING_KNOWN_URLS_KEY, {}).update(resolved)
+        
+        logger.debug(
+            "URLs uniques résolues",
+            cached_count=len(batch_urls) - len(new_rows),
+            created_count=created_count
+        )
+        
+        return url_to_unique_id
+    
     async def create_serp_url_mappings(
         self,
         serp_result_ids: List[str],
         unique_url_ids: List[str]
-    ) -> List[SerpUrlMapping]:
+    ) -> int:
         """
         Crée les mappings entre résultats SERP et URLs uniques.
         
@@ -291,30 +389,27 @@ class URLDeduplicationService:
             unique_url_ids: Liste des IDs d'URLs uniques correspondants
             
         Returns:
-            Liste des mappings créés
+            Nombre de mappings créés
         """
         if len(serp_result_ids) != len(unique_url_ids):
             raise ValueError("Les listes d'IDs doivent avoir la même longueur")
         
-        mappings = []
+        mappings = [
+            {"serp_result_id": serp_id, "unique_url_id": url_id}
+            for serp_id, url_id in zip(serp_result_ids, unique_url_ids)
+        ]
         
         try:
-            for serp_id, url_id in zip(serp_result_ids, unique_url_ids):
-                mapping = SerpUrlMapping(
-                    serp_result_id=serp_id,
-                    unique_url_id=url_id
-                )
-                mappings.append(mapping)
-                self.session.add(mapping)
-            
-            await self.session.flush()
+            # Un seul INSERT multi-lignes au lieu d'un objet ORM par mapping
+            if mappings:
+                await self.session.execute(insert(SerpUrlMapping), mappings)
             
             logger.info(
                 "Mappings SERP-URL créés",
                 mappings_count=len(mappings)
             )
             
-            return mappings
+            return len(mappings)
             
         except Exception as e:
             logger.error(
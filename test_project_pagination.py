@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test de non-régression de la pagination par curseur des projets (SQLite)."""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Base SQLite dédiée, configurée avant l'import de l'application
+_db_dir = tempfile.mkdtemp(prefix="shopping_monitor_test_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/pagination.db"
+
+# Ajouter le répertoire racine au path
+sys.path.append(str(Path(__file__).parent))
+
+import orjson
+
+from app.database import AsyncSessionLocal, close_db, init_db
+from app.models import Project
+from app.api.projects import list_projects
+
+# Projets créés dans la même seconde : created_at identique, départage par id
+PROJECT_COUNT = 5
+PER_PAGE = 2
+
+
+async def fetch_page(session, cursor):
+    """Appelle l'endpoint de liste avec un curseur (tous les paramètres explicites)."""
+    response = await list_projects(
+        page=1,
+        per_page=PER_PAGE,
+        is_active=None,
+        search=None,
+        cursor=cursor,
+        session=session
+    )
+    return orjson.loads(response.body)
+
+
+async def test_cursor_walks_every_project_once():
+    """Suivre next_cursor jusqu'au bout renvoie chaque projet exactement une fois."""
+    await init_db()
+
+    async with AsyncSessionLocal() as session:
+        session.add_all(
+            Project(id=f"p{i}", name=f"Projet pagination {i}")
+            for i in range(1, PROJECT_COUNT + 1)
+        )
+        await session.commit()
+
+    seen = []
+    cursor = None
+    async with AsyncSessionLocal() as session:
+        # Borne de sécurité : une pagination qui n'avance pas ne boucle pas indéfiniment
+        for _ in range(PROJECT_COUNT + 1):
+            data = await fetch_page(session, cursor)
+            seen.extend(project["id"] for project in data["projects"])
+            cursor = data["next_cursor"]
+            if not data["has_next"]:
+                break
+
+    assert cursor is None, "la pagination ne s'arrête pas"
+    assert sorted(seen) == [f"p{i}" for i in range(1, PROJECT_COUNT + 1)], seen
+    assert len(seen) == len(set(seen)), f"projets répétés : {seen}"
+
+
+async def main():
+    """Exécute le test et retourne le code de sortie."""
+    try:
+        await test_cursor_walks_every_project_once()
+        print("✅ Pagination par curseur : chaque projet apparaît une seule fois")
+        return 0
+    except AssertionError as e:
+        print(f"❌ Pagination par curseur : {e}")
+        return 1
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)